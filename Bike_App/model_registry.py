@@ -0,0 +1,151 @@
+"""
+Model Registry for the Bike Sharing App
+Loads the model and feature transformer once per process and keeps load and
+predict timings for the telemetry panel. The app wraps get_registry() in
+st.cache_resource, so every session and rerun shares the same objects.
+
+Model lookup order (all files in the app directory):
+    best_random_forest.forest/   compiled flat arrays, memory-mapped (fast)
+    best_random_forest.joblib    sklearn pickle (fallback)
+
+Single-row predictions are answered from prediction_grid/ (precomputed at
+deploy time, see prediction_grid.py): exactly when the inputs are on the grid,
+interpolated between the weather levels otherwise (approximate). Without
+the grid, or with interpolation turned off, they come from an LRU cache of
+live model calls.
+"""
+
+import functools
+
+import json
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+APP_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# bike_features.py / forest_compiler.py are shared with the training pipeline;
+# copies next to the app take precedence over the project folder
+sys.path.append(os.path.join(APP_DIR, '..', 'Bike_Sharing_Project'))
+from bike_features import BikeFeatureTransformer
+from forest_compiler import CompiledForest
+from prediction_grid import PredictionGrid
+
+TARGET_COLS = ['cnt', 'casual', 'registered']
+CACHE_SIZE = 4096
+
+
+class ModelRegistry:
+    """Model + transformer with timing telemetry"""
+
+    def __init__(self, base_dir=APP_DIR):
+        self.base_dir = base_dir
+        self.telemetry = {}
+        start = time.perf_counter()
+        self.model, self.model_kind = self._load_model()
+        self.telemetry['model_load_ms'] = (time.perf_counter() - start) * 1000
+
+        start = time.perf_counter()
+        self.transformer = self._load_transformer()
+        self.telemetry['transformer_load_ms'] = (time.perf_counter() - start) * 1000
+        self.telemetry['cold_start_ms'] = self.telemetry['model_load_ms'] + self.telemetry['transformer_load_ms']
+        self.telemetry['predict_calls'] = 0
+
+        grid_path = self._path('prediction_grid')
+        self.grid = PredictionGrid(grid_path) if os.path.exists(os.path.join(grid_path, 'meta.json')) else None
+        self.telemetry['grid_hits'] = 0
+        self.telemetry['interpolated_hits'] = 0
+        self.telemetry['cache_hits'] = 0
+        # Shared by all sessions; keys are the raw inputs as a sorted tuple
+        self._cached_predict = functools.lru_cache(maxsize=CACHE_SIZE)(self._predict_key)
+
+    def _path(self, name):
+        return os.path.join(self.base_dir, name)
+
+    def _load_model(self):
+        forest_path = self._path('best_random_forest.forest')
+        if os.path.exists(os.path.join(forest_path, 'meta.json')):
+            return CompiledForest(forest_path), 'compiled forest (memory-mapped)'
+        model_path = self._path('best_random_forest.joblib')
+        if os.path.exists(model_path):
+            import joblib
+            return joblib.load(model_path), 'sklearn (joblib)'
+        raise FileNotFoundError("Model file 'best_random_forest.joblib' not found in root.")
+
+    def _processed_columns(self):
+        """Training columns from the columnar bundle schema or the CSV header"""
+        schema_path = self._path(os.path.join('processed_bike_data.cols', 'schema.json'))
+        if os.path.exists(schema_path):
+            with open(schema_path, 'r', encoding='utf-8') as f:
+                columns = [c['name'] for c in json.load(f)['columns']]
+        else:
+            columns = pd.read_csv(self._path('processed_bike_data.csv'), nrows=0).columns.tolist()
+        return [c for c in columns if c not in TARGET_COLS]
+
+    def _load_transformer(self):
+        transformer_path = self._path('feature_transformer.json')
+        if os.path.exists(transformer_path):
+            return BikeFeatureTransformer.load(transformer_path)
+        # Older deployments without the saved transformer: encode against the
+        # processed column list (no weather scaling)
+        try:
+            columns = self._processed_columns()
+        except FileNotFoundError:
+            columns = []
+        if not columns:
+            raise FileNotFoundError("Neither 'feature_transformer.json' nor 'processed_bike_data.csv' found.")
+        return BikeFeatureTransformer(columns)
+
+    def predict(self, raw):
+        """Encode raw inputs (dict or DataFrame) and predict; returns (features, predictions)"""
+        start = time.perf_counter()
+        X = self.transformer.transform(raw)
+        predictions = self.model.predict(X)
+        self.telemetry['last_predict_ms'] = (time.perf_counter() - start) * 1000
+        self.telemetry['last_predict_rows'] = len(X)
+        self.telemetry['predict_calls'] += 1
+        return X, predictions
+
+    def sweep(self, raw, varying):
+        """Predict a scenario matrix in one call: every column in varying
+        (name -> equal-length array) changes per row, all other inputs keep
+        their value from raw"""
+        n = len(next(iter(varying.values())))
+        scenarios = {col: np.full(n, value) for col, value in raw.items() if col not in varying}
+        scenarios.update({col: np.asarray(values) for col, values in varying.items()})
+        return self.predict(scenarios)[1]
+
+    def _predict_key(self, key):
+        return float(self.predict(dict(key))[1][0])
+
+    def predict_one(self, raw, interpolate=True):
+        """(prediction, source) for one raw input dict: grid lookup, grid
+        interpolation (if allowed), then cached live call. The registry is
+        shared by all sessions, so the source is returned rather than read
+        back from telemetry; 'interpolated' values are approximate."""
+        start = time.perf_counter()
+        prediction = None
+        if self.grid is not None:
+            prediction, source = self.grid.lookup(raw), 'grid'
+            if prediction is None and interpolate:
+                prediction, source = self.grid.interpolate(raw), 'interpolated'
+        if prediction is not None:
+            self.telemetry['grid_hits' if source == 'grid' else 'interpolated_hits'] += 1
+        else:
+            misses = self._cached_predict.cache_info().misses
+            prediction = self._cached_predict(tuple(sorted(raw.items())))
+            if self._cached_predict.cache_info().misses == misses:
+                self.telemetry['cache_hits'] += 1
+                source = 'cache'
+            else:
+                source = 'model'
+        self.telemetry['last_lookup_ms'] = (time.perf_counter() - start) * 1000
+        self.telemetry['last_source'] = source
+        return prediction, source
+
+
+def get_registry(base_dir=APP_DIR):
+    return ModelRegistry(base_dir)
@@ -1,23 +1,27 @@
-import streamlit as st
-import pandas as pd
-import joblib
+import time
+_rerun_start = time.perf_counter()
+
 import numpy as np
-import os
-
-# FLAT STRUCTURE: Expect all files in the SAME directory
-current_dir = os.path.dirname(os.path.abspath(__file__))
-model_path = os.path.join(current_dir, 'best_random_forest.joblib')
-data_path = os.path.join(current_dir, 'processed_bike_data.csv')
-
-# Load model
-if os.path.exists(model_path):
-    model = joblib.load(model_path)
-else:
-    st.error(f"Critical Error: Model file 'best_random_forest.joblib' not found in root.")
-    st.stop()
+import pandas as pd
+import streamlit as st
+from model_registry import get_registry
 
 st.set_page_config(page_title="Bike Sharing Demand Predictor", layout="centered")
 
+
+# Model and transformer are loaded once per process and shared by every
+# session; Streamlit reruns only pay for encoding and predict
+@st.cache_resource
+def load_registry():
+    return get_registry()
+
+
+try:
+    registry = load_registry()
+except FileNotFoundError as e:
+    st.error(f"Critical Error: {e}")
+    st.stop()
+
 st.title("🚲 Bike Sharing Rental Demand Prediction")
 st.markdown("""
 Predict the total number of bike rentals based on weather, time, and seasonal factors.
@@ -45,59 +49,106 @@ def user_input_features():
     season = st.sidebar.selectbox("Season", ["springer", "summer", "fall", "winter"])
     weather_sit = st.sidebar.selectbox("Weather Situation", ["Clear", "Mist", "Light Snow", "Heavy Rain"])
     
-    # Create the feature dict
-    data = {
-        'yr': [yr],
-        'holiday': [1 if holiday else 0],
-        'workingday': [1 if workingday else 0],
-        'temp': [temp],
-        'atemp': [atemp],
-        'hum': [hum],
-        'windspeed': [windspeed],
-        'hr_sin': [np.sin(2 * np.pi * hr / 24)],
-        'hr_cos': [np.cos(2 * np.pi * hr / 24)],
-        'mnth_sin': [np.sin(2 * np.pi * mnth / 12)],
-        'mnth_cos': [np.cos(2 * np.pi * mnth / 12)],
-        'weekday_sin': [np.sin(2 * np.pi * weekday / 7)],
-        'weekday_cos': [np.cos(2 * np.pi * weekday / 7)],
-        'day_sin': [np.sin(2 * np.pi * 15 / 31)],
-        'day_cos': [np.cos(2 * np.pi * 15 / 31)],
+    # Raw inputs; encoding happens in the shared feature transformer
+    return {
+        'yr': yr,
+        'holiday': int(holiday),
+        'workingday': int(workingday),
+        'temp': temp,
+        'atemp': atemp,
+        'hum': hum,
+        'windspeed': windspeed,
+        'hr': hr,
+        'mnth': mnth,
+        'weekday': weekday,
+        'season': season,
+        'weathersit': weather_sit,
     }
-    
-    # One-Hot Encoding for Season
-    data['season_springer'] = [1 if season == 'springer' else 0]
-    data['season_summer'] = [1 if season == 'summer' else 0]
-    data['season_winter'] = [1 if season == 'winter' else 0]
-    
-    # One-Hot Encoding for Weather
-    data['weather_Heavy Rain'] = [1 if weather_sit == 'Heavy Rain' else 0]
-    data['weather_Light Snow'] = [1 if weather_sit == 'Light Snow' else 0]
-    data['weather_Mist'] = [1 if weather_sit == 'Mist' else 0]
-    
-    return pd.DataFrame(data)
 
-# Load columns from processed data to ensure exact match
-try:
-    processed_cols = pd.read_csv(data_path, nrows=0).columns.tolist()
-    processed_cols = [c for c in processed_cols if c not in ['cnt', 'casual', 'registered']]
-except:
-    processed_cols = []
+raw_input = user_input_features()
 
-input_df = user_input_features()
+# With the precomputed grid deployed, predictions between its weather levels
+# are interpolated from the table (instant, approximate) unless exact is asked for
+interpolate = registry.grid is not None and not st.sidebar.checkbox(
+    "Exact model prediction", value=False,
+    help="Off: weather values between the precomputed grid levels are interpolated (instant, approximate).")
 
-# Ensure column order matches training data
-if processed_cols:
-    for col in processed_cols:
-        if col not in input_df.columns:
-            input_df[col] = 0
-    input_df = input_df[processed_cols]
+input_df = registry.transformer.to_frame(registry.transformer.transform(raw_input))
 
 st.subheader("Selected Parameters Summary")
 st.write(input_df)
 
 if st.button("Predict"):
-    prediction = model.predict(input_df)
-    st.success(f"### Predicted Total Bike Rentals: {int(prediction[0])}")
+    prediction, source = registry.predict_one(raw_input, interpolate=interpolate)
+    if source == 'interpolated':
+        st.success(f"### Predicted Total Bike Rentals: ~{int(prediction)}")
+        st.caption("Approximate: interpolated between the precomputed grid's weather levels. "
+                   "Tick 'Exact model prediction' for the model's own value.")
+    else:
+        st.success(f"### Predicted Total Bike Rentals: {int(prediction)}")
+
+DAY_NAMES = ["Sunday", "Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday"]
+
+
+# Each view is one batched predict over its scenario matrix; results are
+# cached per input set, so moving back to earlier inputs costs nothing
+@st.cache_data(max_entries=512, show_spinner=False)
+def sweep_frame(raw_items, view):
+    raw = dict(raw_items)
+    if view == 'day':
+        hours = np.arange(24)
+        predictions = registry.sweep(raw, {'hr': hours})
+        return pd.DataFrame({'Predicted rentals': predictions}, index=pd.Index(hours, name='Hour')), len(predictions)
+    if view == 'week':
+        weekday = np.repeat(np.arange(7), 24)
+        hours = np.tile(np.arange(24), 7)
+        # Weekends are never working days
+        workingday = ((weekday >= 1) & (weekday <= 5) & (raw['holiday'] == 0)).astype(int)
+        predictions = registry.sweep(raw, {'weekday': weekday, 'hr': hours, 'workingday': workingday})
+        return pd.DataFrame(predictions.reshape(7, 24).T, columns=DAY_NAMES,
+                            index=pd.Index(np.arange(24), name='Hour')), len(predictions)
+    # view == 'temperature': feeling temperature keeps its offset from temp
+    temps = np.round(np.linspace(0.0, 1.0, 101), 2)
+    atemps = np.clip(temps + (raw['atemp'] - raw['temp']), 0.0, 1.0)
+    hours = np.arange(24)
+    predictions = registry.sweep(raw, {'temp': np.tile(temps, 24), 'atemp': np.tile(atemps, 24),
+                                       'hr': np.repeat(hours, len(temps))})
+    surface = predictions.reshape(24, len(temps))
+    return pd.DataFrame({'Selected hour': surface[raw['hr']], 'Daily total': surface.sum(axis=0)},
+                        index=pd.Index(temps, name='Temperature')), len(predictions)
+
+
+st.subheader("What-if Sweeps")
+day_tab, week_tab, temp_tab = st.tabs(["Selected day", "Whole week", "Temperature range"])
+raw_items = tuple(sorted(raw_input.items()))
+for tab, view, caption in [
+    (day_tab, 'day', "Demand for every hour of the selected day."),
+    (week_tab, 'week', "Demand for every hour of every weekday (working day follows the weekday)."),
+    (temp_tab, 'temperature', "Demand across the temperature range for the chosen weather."),
+]:
+    with tab:
+        start = time.perf_counter()
+        frame, n_scenarios = sweep_frame(raw_items, view)
+        elapsed = (time.perf_counter() - start) * 1000
+        if view == 'temperature':
+            st.line_chart(frame[['Selected hour']])
+            st.line_chart(frame[['Daily total']])
+        else:
+            st.line_chart(frame)
+        st.caption(f"{caption} {n_scenarios:,} scenarios, {elapsed:.1f} ms")
 
 st.markdown("---")
 st.markdown("Developed for Bike-Sharing Rental Demand Analysis.")
+
+with st.expander("Performance telemetry"):
+    telemetry = registry.telemetry
+    st.write(f"Model: {registry.model_kind}")
+    col1, col2, col3 = st.columns(3)
+    col1.metric("Cold start (once per process)", f"{telemetry['cold_start_ms']:.1f} ms")
+    col2.metric("This rerun", f"{(time.perf_counter() - _rerun_start) * 1000:.1f} ms")
+    if 'last_lookup_ms' in telemetry:
+        col3.metric(f"Last prediction ({telemetry['last_source']})", f"{telemetry['last_lookup_ms']:.2f} ms")
+    st.write(f"Prediction grid: {'loaded' if registry.grid is not None else 'not deployed'} | "
+             f"grid hits: {telemetry['grid_hits']} | interpolated: {telemetry['interpolated_hits']} | "
+             f"cache hits: {telemetry['cache_hits']} | "
+             f"model calls: {telemetry['predict_calls']}")
@@ -0,0 +1,188 @@
+"""
+Batch Demand Scoring
+Scores a file of raw hourly scenarios (hr, mnth, weekday, yr, holiday,
+workingday, season, weathersit, temp, atemp, hum, windspeed, plus any extra
+columns to carry through) with the training-time feature encoding.
+
+The input is read in fixed-size chunks and scored across a process pool.
+Each chunk is written to its own part file in the output directory as soon
+as it is done, so a crashed run can be resumed: finished parts are skipped.
+A chunk that cannot be encoded (missing column, non-numeric or empty value)
+stops the run with the chunk, row and column named.
+
+Usage:
+    python batch_score.py scenarios.csv forecasts/ [--workers 8] [--chunksize 100000]
+    python batch_score.py scenarios.cols forecasts/      # columnar bundle input
+    python batch_score.py scenarios.csv forecasts/ --merge forecasts.csv
+"""
+
+import argparse
+import collections
+import glob
+import json
+import multiprocessing
+import os
+import time
+
+import numpy as np
+import pandas as pd
+from bike_features import BikeFeatureTransformer
+from bike_store import load_table, read_schema
+
+MANIFEST = '_manifest.json'
+PREDICTION_COL = 'predicted_cnt'
+
+# Per-worker state, loaded once by _init_worker
+_model = None
+_transformer = None
+
+
+def load_model(path):
+    """Compiled forest directory (memory-mapped) or a joblib pickle"""
+    if os.path.exists(os.path.join(path, 'meta.json')):
+        from forest_compiler import CompiledForest
+        return CompiledForest(path)
+    import joblib
+    return joblib.load(path)
+
+
+def _init_worker(model_path, transformer_path):
+    global _model, _transformer
+    _model = load_model(model_path)
+    _transformer = BikeFeatureTransformer.load(transformer_path)
+
+
+def _encode(chunk, start):
+    """Validated model matrix for one chunk; ValueError names the column"""
+    missing = [col for col in _transformer.raw_columns if col not in chunk.columns]
+    if missing:
+        raise ValueError(f"missing columns {missing}")
+    X = _transformer.transform(chunk)
+    bad = ~np.isfinite(X)
+    if bad.any():
+        j = int(np.flatnonzero(bad.any(axis=0))[0])
+        rows = np.flatnonzero(bad[:, j])
+        raise ValueError(f"column '{_transformer.sources[j]}': {len(rows):,} empty or non-numeric "
+                         f"values (first at row {start + rows[0] + 1:,})")
+    return X
+
+
+def _score_chunk(job):
+    """Encode, predict and write one chunk; returns (index, rows)"""
+    index, start, chunk, part_path = job
+    try:
+        X = _encode(chunk, start)
+    except ValueError as exc:
+        raise ValueError(f"chunk {index} (rows {start + 1:,}-{start + len(chunk):,}): {exc}") from None
+    chunk[PREDICTION_COL] = np.round(_model.predict(X), 2)
+    tmp_path = part_path + '.tmp'
+    chunk.to_csv(tmp_path, index=False)
+    # Atomic rename: a part file either exists complete or not at all
+    os.replace(tmp_path, part_path)
+    return index, len(chunk)
+
+
+def iter_chunks(input_path, chunksize):
+    """Yield DataFrame chunks from a CSV or a columnar bundle"""
+    if os.path.isdir(input_path):
+        n_rows = read_schema(input_path)['n_rows']
+        for start in range(0, n_rows, chunksize):
+            yield load_table(input_path, as_category=False, rows=slice(start, start + chunksize))
+    else:
+        yield from pd.read_csv(input_path, chunksize=chunksize)
+
+
+def check_manifest(output_dir, settings):
+    """Refuse to resume into a directory written with different settings"""
+    path = os.path.join(output_dir, MANIFEST)
+    if os.path.exists(path):
+        with open(path, 'r', encoding='utf-8') as f:
+            previous = json.load(f)
+        if previous != settings:
+            raise SystemExit(f"{output_dir} was written with different settings: {previous}. "
+                             "Use a new output directory.")
+    else:
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(settings, f, indent=2)
+
+
+def merge_parts(output_dir, merged_path):
+    parts = sorted(glob.glob(os.path.join(output_dir, 'part-*.csv')))
+    with open(merged_path, 'w', encoding='utf-8', newline='') as out:
+        for i, part in enumerate(parts):
+            with open(part, 'r', encoding='utf-8') as f:
+                header = f.readline()
+                if i == 0:
+                    out.write(header)
+                for line in f:
+                    out.write(line)
+    print(f"Merged {len(parts)} parts into {merged_path}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Score raw bike demand scenarios in batch.")
+    parser.add_argument('input', help="CSV file or columnar bundle (.cols) of raw scenarios.")
+    parser.add_argument('output_dir', help="Directory for part files (resumable).")
+    # sklearn stays faster than the NumPy evaluator on large chunks; a
+    # compiled .forest directory also works (no sklearn needed)
+    parser.add_argument('--model', default='models/best_random_forest.joblib',
+                        help=".joblib model or compiled forest directory.")
+    parser.add_argument('--transformer', default='models/feature_transformer.json')
+    parser.add_argument('--chunksize', type=int, default=100_000)
+    parser.add_argument('--workers', type=int, default=os.cpu_count())
+    parser.add_argument('--merge', metavar='CSV', help="Concatenate the parts into one CSV at the end.")
+    args = parser.parse_args()
+
+    os.makedirs(args.output_dir, exist_ok=True)
+    check_manifest(args.output_dir, {
+        'input': os.path.abspath(args.input),
+        'chunksize': args.chunksize,
+        'model': os.path.abspath(args.model),
+    })
+
+    start = time.perf_counter()
+    scored_rows = 0
+    skipped = 0
+    # Bounded number of chunks in flight keeps memory flat for any input size
+    max_pending = 2 * args.workers
+    pending = collections.deque()
+
+    def collect(wait):
+        """Record finished chunks; with wait=True block until at least one is done"""
+        nonlocal scored_rows
+        while pending and (wait or pending[0].ready()):
+            try:
+                _, rows = pending.popleft().get()
+            except ValueError as exc:
+                raise SystemExit(f"Cannot score {args.input}, {exc}. Finished parts are kept.") from None
+            scored_rows += rows
+            elapsed = time.perf_counter() - start
+            print(f"  {scored_rows:,} rows scored ({scored_rows / elapsed:,.0f} rows/s)")
+            wait = False
+
+    with multiprocessing.Pool(args.workers, initializer=_init_worker,
+                              initargs=(args.model, args.transformer)) as pool:
+        start_row = 0
+        for index, chunk in enumerate(iter_chunks(args.input, args.chunksize)):
+            part_path = os.path.join(args.output_dir, f'part-{index:05d}.csv')
+            chunk_start, start_row = start_row, start_row + len(chunk)
+            if os.path.exists(part_path):
+                skipped += 1
+                continue
+            while len(pending) >= max_pending:
+                collect(wait=True)
+            pending.append(pool.apply_async(_score_chunk, ((index, chunk_start, chunk, part_path),)))
+            collect(wait=False)
+        while pending:
+            collect(wait=True)
+
+    elapsed = time.perf_counter() - start
+    print(f"\nScored {scored_rows:,} rows in {elapsed:.1f}s "
+          f"({scored_rows / max(elapsed, 1e-9):,.0f} rows/s); {skipped} finished chunks skipped.")
+
+    if args.merge:
+        merge_parts(args.output_dir, args.merge)
+
+
+if __name__ == "__main__":
+    main()
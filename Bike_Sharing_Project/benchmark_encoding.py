@@ -0,0 +1,94 @@
+"""
+Encoding Benchmark
+Times the original pandas encoding steps of feature_engineering_v2.py
+(mode via filtered copy, replace, map, get_dummies, float64 sin/cos) against
+bike_features.CategoricalEncoder, on the cleaned table and on a replicated copy.
+
+Usage:
+    python benchmark_encoding.py [--replicate 100]
+"""
+
+import argparse
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+from bike_store import read_bike_table, CLEANED_SCHEMA
+from bike_features import CategoricalEncoder
+
+
+def legacy_encode(df):
+    """The encoding steps as originally written in feature_engineering_v2.py"""
+    df = df.copy()
+    mode_holiday = df[df['holiday'] != '?']['holiday'].mode()[0]
+    df['holiday'] = df['holiday'].replace('?', mode_holiday)
+    df['holiday'] = df['holiday'].map({'No': 0, 'Yes': 1}).astype(int)
+
+    mode_working = df[df['workingday'] != '?']['workingday'].mode()[0]
+    df['workingday'] = df['workingday'].replace('?', mode_working)
+    df['workingday'] = df['workingday'].map({'No work': 0, 'Working Day': 1}).astype(int)
+
+    mode_weather = df[df['weathersit'] != '?']['weathersit'].mode()[0]
+    df['weathersit'] = df['weathersit'].replace('?', mode_weather)
+
+    df = pd.get_dummies(df, columns=['season', 'weathersit'], prefix=['season', 'weather'], drop_first=True)
+    for col, max_val in [('hr', 24), ('mnth', 12), ('weekday', 7)]:
+        df[col + '_sin'] = np.sin(2 * np.pi * df[col] / max_val)
+        df[col + '_cos'] = np.cos(2 * np.pi * df[col] / max_val)
+    return df
+
+
+def measure(fn, df):
+    """Wall time, traced peak allocation and size of the result"""
+    tracemalloc.start()
+    start = time.perf_counter()
+    out = fn(df)
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, peak / 1e6, out.memory_usage(deep=True).sum() / 1e6, out
+
+
+def report(label, df):
+    legacy = measure(legacy_encode, df)
+    encoder = measure(lambda d: CategoricalEncoder().fit_transform(d), df)
+
+    # Same columns and values, only narrower dtypes
+    same_cols = list(legacy[3].columns) == list(encoder[3].columns)
+    max_diff = max(
+        float(np.abs(legacy[3][c].astype('float64') - encoder[3][c].astype('float64')).max())
+        for c in encoder[3].columns
+        if c in legacy[3] and pd.api.types.is_numeric_dtype(encoder[3][c])
+    )
+
+    print(f"\n--- {label} ({len(df):,} rows) ---")
+    print(f"{'':<10} {'Time (s)':>10} {'Peak MB':>10} {'Output MB':>10}")
+    print(f"{'legacy':<10} {legacy[0]:>10.3f} {legacy[1]:>10.1f} {legacy[2]:>10.1f}")
+    print(f"{'encoder':<10} {encoder[0]:>10.3f} {encoder[1]:>10.1f} {encoder[2]:>10.1f}")
+    print(f"Speedup: {legacy[0] / encoder[0]:.1f}x, output {legacy[2] / encoder[2]:.1f}x smaller")
+    print(f"Same columns: {same_cols}, max abs difference: {max_diff:.2e}")
+
+
+def prepare(df):
+    """Same pre-steps as feature_engineering_v2.py before encoding"""
+    df['dteday'] = pd.to_datetime(df['dteday'])
+    df['mnth'] = df['dteday'].dt.month
+    df['yr'] = df['dteday'].dt.year.map({2011: 0, 2012: 1})
+    for col, fill in [('hr', 0), ('mnth', 1), ('weekday', 0)]:
+        df[col] = pd.to_numeric(df[col], errors='coerce').fillna(fill).astype(int)
+    return df
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark categorical encoding.")
+    parser.add_argument('--replicate', type=int, default=100)
+    args = parser.parse_args()
+
+    df = prepare(read_bike_table('cleaned_bike_data.csv', CLEANED_SCHEMA, as_category=False))
+    report("cleaned_bike_data", df)
+    report(f"{args.replicate}x replicated", pd.concat([df] * args.replicate, ignore_index=True))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+"""
+Storage Benchmark
+Compares parsing processed_bike_data.csv against loading the columnar bundle,
+on the real table and on a replicated copy (default 100x).
+
+Usage:
+    python benchmark_storage.py [--replicate 100]
+"""
+
+import argparse
+import os
+import shutil
+import tempfile
+import time
+
+import pandas as pd
+from bike_store import read_bike_table, load_table, save_table, bundle_path, PROCESSED_SCHEMA
+
+
+def timed(fn, repeat=3):
+    """Best-of-n wall time and the result of the last call"""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def report(label, csv_path, bundle):
+    csv_time, df_csv = timed(lambda: pd.read_csv(csv_path))
+    bundle_time, df_bundle = timed(lambda: load_table(bundle))
+    subset_time, _ = timed(lambda: load_table(bundle, columns=['cnt', 'temp', 'hr_sin', 'hr_cos']))
+
+    csv_mb = df_csv.memory_usage(deep=True).sum() / 1e6
+    bundle_mb = df_bundle.memory_usage(deep=True).sum() / 1e6
+    print(f"\n--- {label} ({len(df_csv):,} rows) ---")
+    print(f"CSV parse:        {csv_time * 1000:9.1f} ms  {csv_mb:8.1f} MB in memory")
+    print(f"Bundle load:      {bundle_time * 1000:9.1f} ms  {bundle_mb:8.1f} MB in memory")
+    print(f"Bundle 4 columns: {subset_time * 1000:9.1f} ms")
+    print(f"Speedup: {csv_time / bundle_time:.1f}x, memory: {csv_mb / bundle_mb:.1f}x smaller")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark CSV vs columnar loading.")
+    parser.add_argument('--replicate', type=int, default=100)
+    args = parser.parse_args()
+
+    csv_path = 'processed_bike_data.csv'
+    df = read_bike_table(csv_path, PROCESSED_SCHEMA)
+    report("processed_bike_data", csv_path, bundle_path(csv_path))
+
+    tmp_dir = tempfile.mkdtemp(prefix='bike_bench_')
+    try:
+        big = pd.concat([df] * args.replicate, ignore_index=True)
+        big_csv = os.path.join(tmp_dir, 'big.csv')
+        big.to_csv(big_csv, index=False)
+        save_table(big, bundle_path(big_csv), PROCESSED_SCHEMA)
+        del big
+        report(f"{args.replicate}x replicated", big_csv, bundle_path(big_csv))
+    finally:
+        shutil.rmtree(tmp_dir)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,306 @@
+"""
+Bike Sharing Feature Encoding
+Vectorized replacement for the categorical repair, one-hot and cyclic steps
+of feature_engineering_v2.py. Every column is turned into pd.Categorical codes
+once; imputation, flag mapping and one-hot expansion are then integer array
+operations on those codes.
+
+Output dtypes: int8 flags, uint8 one-hots, float32 sin/cos.
+
+BikeFeatureTransformer replays the same encoding (plus the MinMax scaling) on
+raw scenario rows at inference time and is saved as models/feature_transformer.json.
+"""
+
+import json
+
+import numpy as np
+import pandas as pd
+
+MISSING_TOKEN = '?'
+
+# Text flags mapped to 0/1
+FLAG_MAPS = {
+    'holiday': {'No': 0, 'Yes': 1},
+    'workingday': {'No work': 0, 'Working Day': 1},
+}
+
+# Columns whose '?' entries are replaced by the most frequent value
+IMPUTE_COLS = ['holiday', 'workingday', 'weathersit']
+
+# One-hot columns and their output prefix (first category dropped)
+ONEHOT_COLS = {'season': 'season', 'weathersit': 'weather'}
+
+# Cyclic columns and their period
+CYCLIC_COLS = {'hr': 24, 'mnth': 12, 'weekday': 7}
+
+# Raw values recoded for the model (the cleaned data stores the year itself)
+VALUE_MAPS = {'yr': {2011: 0, 2012: 1}}
+
+# Calendar columns the training script rebuilds from the date column
+DATE_COL = 'dteday'
+DATE_PARTS = {'yr': 'year', 'mnth': 'month'}
+
+
+class CategoricalEncoder:
+    """Learns modes and vocabularies once, then encodes in one pass"""
+
+    def __init__(self, flags=None, impute=None, onehot=None, cyclic=None,
+                 missing=MISSING_TOKEN):
+        self.flags = dict(FLAG_MAPS if flags is None else flags)
+        self.impute = list(IMPUTE_COLS if impute is None else impute)
+        self.onehot = dict(ONEHOT_COLS if onehot is None else onehot)
+        self.cyclic = dict(CYCLIC_COLS if cyclic is None else cyclic)
+        self.missing = missing
+        self.vocab_ = {}
+        self.modes_ = {}
+
+    def fit(self, df):
+        for col in sorted(set(self.flags) | set(self.impute) | set(self.onehot)):
+            cat = pd.Categorical(df[col])
+            categories = [c.item() if hasattr(c, 'item') else c for c in cat.categories]
+            if col in self.impute and self.missing in categories:
+                # Mode over the non-missing values; ties go to the first
+                # category in sorted order, as with Series.mode()[0]
+                missing_code = categories.index(self.missing)
+                counts = np.bincount(cat.codes[cat.codes >= 0], minlength=len(categories))
+                counts[missing_code] = -1
+                self.modes_[col] = categories[int(np.argmax(counts))]
+                categories.remove(self.missing)
+            elif col in self.impute:
+                self.modes_[col] = categories[int(np.argmax(np.bincount(cat.codes[cat.codes >= 0])))]
+            if col in self.flags:
+                # Flag vocabularies follow the mapping so codes are the 0/1 values
+                categories = sorted(self.flags[col], key=self.flags[col].get)
+            self.vocab_[col] = categories
+        return self
+
+    def _codes(self, df, col):
+        codes = pd.Categorical(df[col], categories=self.vocab_[col]).codes.copy()
+        if col in self.modes_:
+            # '?' and anything unseen fall outside the vocabulary (-1)
+            codes[codes < 0] = self.vocab_[col].index(self.modes_[col])
+        return codes
+
+    def transform(self, df):
+        """Encode df, keeping the column layout of the original script:
+        one-hot source columns are replaced by dummies appended at the end,
+        followed by the sin/cos pairs."""
+        out = {}
+        dummies = {}
+        codes = {col: self._codes(df, col) for col in self.vocab_}
+
+        for col in df.columns:
+            if col in self.onehot:
+                continue
+            if col in self.flags:
+                out[col] = codes[col].astype(np.int8)
+            elif col in self.modes_:
+                out[col] = np.asarray(self.vocab_[col], dtype=object)[codes[col]]
+            else:
+                out[col] = df[col].to_numpy()
+
+        for col, prefix in self.onehot.items():
+            vocab = self.vocab_[col]
+            # Compare against codes 1..K-1 (drop_first); unknown codes give all zeros
+            hot = codes[col][:, None] == np.arange(1, len(vocab), dtype=codes[col].dtype)
+            for j, value in enumerate(vocab[1:]):
+                dummies[f"{prefix}_{value}"] = hot[:, j].astype(np.uint8)
+
+        out.update(dummies)
+        for col, period in self.cyclic.items():
+            angle = (2 * np.pi / period) * df[col].to_numpy(dtype=np.float32)
+            out[col + '_sin'] = np.sin(angle, dtype=np.float32)
+            out[col + '_cos'] = np.cos(angle, dtype=np.float32)
+
+        return pd.DataFrame(out, index=df.index)
+
+    def fit_transform(self, df):
+        return self.fit(df).transform(df)
+
+    def to_dict(self):
+        return {
+            'flags': self.flags,
+            'impute': self.impute,
+            'onehot': self.onehot,
+            'cyclic': self.cyclic,
+            'missing': self.missing,
+            'vocab': self.vocab_,
+            'modes': self.modes_,
+        }
+
+    @classmethod
+    def from_dict(cls, d):
+        enc = cls(flags=d['flags'], impute=d['impute'], onehot=d['onehot'],
+                  cyclic=d['cyclic'], missing=d['missing'])
+        enc.vocab_ = d['vocab']
+        enc.modes_ = d['modes']
+        return enc
+
+
+class BikeFeatureTransformer:
+    """Raw scenario rows -> model matrix, in the training column order.
+
+    Raw inputs are hr, mnth, weekday, yr, holiday, workingday, season,
+    weathersit, temp, atemp, hum and windspeed (as in cleaned_bike_data.csv,
+    optionally with dteday). The training-time repairs are replayed first:
+    yr and mnth come from dteday when it parses, yr is recoded 2011/2012 ->
+    0/1 (0/1 pass through), and '?' in the categorical and calendar columns
+    is replaced by the fitted mode. transform() then fills a float32 matrix
+    column by column, so N rows cost a handful of array operations instead
+    of one DataFrame per row.
+    """
+
+    def __init__(self, columns, flags=None, onehot=None, cyclic=None, scale=None,
+                 maps=None, modes=None, dates=None, missing=MISSING_TOKEN):
+        self.columns = list(columns)
+        self.flags = dict(FLAG_MAPS if flags is None else flags)
+        self.onehot = dict(ONEHOT_COLS if onehot is None else onehot)
+        self.cyclic = dict(CYCLIC_COLS if cyclic is None else cyclic)
+        # MinMaxScaler parameters per column: [min_, scale_]
+        self.scale = dict(scale or {})
+        self.maps = {col: dict(m) for col, m in (VALUE_MAPS if maps is None else maps).items()}
+        # Replacement for missing raw values, per raw column
+        self.modes = dict(modes or {})
+        self.dates = dict(DATE_PARTS if dates is None else dates)
+        self.missing = missing
+        self._plan = [self._plan_column(col) for col in self.columns]
+        # Raw input column behind each output column
+        self.sources = [col for _, col, _ in self._plan]
+
+    @property
+    def raw_columns(self):
+        """Raw input columns read by transform(), in first-use order"""
+        return list(dict.fromkeys(self.sources))
+
+    def _plan_column(self, col):
+        """(kind, source column, argument) used to fill one output column"""
+        for base, period in self.cyclic.items():
+            if col == base + '_sin':
+                return ('sin', base, period)
+            if col == base + '_cos':
+                return ('cos', base, period)
+        for base, prefix in self.onehot.items():
+            if col.startswith(prefix + '_'):
+                return ('onehot', base, col[len(prefix) + 1:])
+        if col in self.flags:
+            return ('flag', col, self.flags[col])
+        if col in self.scale:
+            return ('scaled', col, self.scale[col])
+        if col in self.maps:
+            return ('mapped', col, self.maps[col])
+        return ('value', col, None)
+
+    @classmethod
+    def fit(cls, columns, encoder, scaler=None, scale_cols=(), data=None):
+        """Build from the fitted CategoricalEncoder and MinMaxScaler; data
+        (the encoded training frame) supplies the modes of the calendar columns"""
+        scale = {}
+        if scaler is not None:
+            for i, col in enumerate(scale_cols):
+                scale[col] = [float(scaler.min_[i]), float(scaler.scale_[i])]
+        transformer = cls(columns, flags=encoder.flags, onehot=encoder.onehot,
+                          cyclic=encoder.cyclic, scale=scale, modes=encoder.modes_,
+                          missing=encoder.missing)
+        if data is not None:
+            for kind, col, _ in transformer._plan:
+                if kind in ('value', 'mapped', 'sin', 'cos') and col not in transformer.modes:
+                    transformer.modes[col] = data[col].mode()[0].item()
+        return transformer
+
+    def _raw(self, raw, col):
+        """One raw column with the training-time repairs applied"""
+        values = np.atleast_1d(np.asarray(raw[col]))
+        if col in self.dates and DATE_COL in raw:
+            dates = pd.to_datetime(pd.Series(np.atleast_1d(np.asarray(raw[DATE_COL]))), errors='coerce')
+            parts = getattr(dates.dt, self.dates[col])
+            if parts.notna().any():
+                values = np.where(parts.notna(), parts, values)
+        if col in self.modes:
+            missing = pd.isna(values)
+            if values.dtype.kind in 'OUS':
+                missing |= values == self.missing
+            if missing.any():
+                values = np.where(missing, self.modes[col], values.astype(object))
+        return values
+
+    @staticmethod
+    def _numeric(values, col):
+        try:
+            return values.astype(np.float32)
+        except ValueError as exc:
+            raise ValueError(f"column '{col}': {exc}") from None
+
+    @staticmethod
+    def _recode(values, col, mapping):
+        """Map raw values to codes; values that are already codes pass through"""
+        coded = pd.Series(values).map(mapping).to_numpy(dtype=np.float32)
+        if values.dtype.kind not in 'OUS':
+            coded = np.where(np.isin(values, list(mapping.values())), values, coded)
+        if np.isnan(coded).any():
+            unknown = pd.unique(values[np.isnan(coded)])
+            raise ValueError(f"column '{col}': unexpected values {list(unknown[:5])}")
+        return coded
+
+    def transform(self, raw):
+        """raw: DataFrame or dict of equal-length arrays (or scalars for one row)"""
+        cache = {}
+
+        def source(col):
+            if col not in cache:
+                cache[col] = self._raw(raw, col)
+            return cache[col]
+
+        n = len(source(self._plan[0][1]))
+        X = np.empty((n, len(self.columns)), dtype=np.float32)
+        for j, (kind, col, arg) in enumerate(self._plan):
+            values = source(col)
+            if kind == 'onehot':
+                if (col, str) not in cache:
+                    cache[(col, str)] = values.astype(str)
+                X[:, j] = cache[(col, str)] == arg
+            elif kind == 'flag':
+                X[:, j] = self._recode(values, col, arg)
+            elif kind == 'mapped':
+                X[:, j] = self._recode(self._numeric(values, col), col, arg)
+            elif kind == 'scaled':
+                X[:, j] = self._numeric(values, col) * np.float32(arg[1]) + np.float32(arg[0])
+            elif kind in ('sin', 'cos'):
+                angle = (2 * np.pi / arg) * self._numeric(values, col)
+                X[:, j] = np.sin(angle) if kind == 'sin' else np.cos(angle)
+            else:
+                X[:, j] = self._numeric(values, col)
+        return X
+
+    def to_frame(self, X):
+        return pd.DataFrame(X, columns=self.columns)
+
+    def to_dict(self):
+        return {
+            'columns': self.columns,
+            'flags': self.flags,
+            'onehot': self.onehot,
+            'cyclic': self.cyclic,
+            'scale': self.scale,
+            'maps': self.maps,
+            'modes': self.modes,
+            'dates': self.dates,
+            'missing': self.missing,
+        }
+
+    @classmethod
+    def from_dict(cls, d):
+        # JSON object keys are strings; the value maps are keyed by number
+        maps = {col: {int(k): v for k, v in m.items()} for col, m in d.get('maps', VALUE_MAPS).items()}
+        return cls(d['columns'], flags=d['flags'], onehot=d['onehot'],
+                   cyclic=d['cyclic'], scale=d['scale'], maps=maps,
+                   modes=d.get('modes'), dates=d.get('dates'),
+                   missing=d.get('missing', MISSING_TOKEN))
+
+    def save(self, path):
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.to_dict(), f, indent=2)
+
+    @classmethod
+    def load(cls, path):
+        with open(path, 'r', encoding='utf-8') as f:
+            return cls.from_dict(json.load(f))
@@ -0,0 +1,336 @@
+"""
+Columnar Storage for the Bike Sharing Tables
+Stores a DataFrame as a directory of .npy files (one per column) plus a
+schema.json, so downstream scripts can memory-map only the columns they need
+instead of re-parsing the CSV text.
+
+    cleaned_bike_data.cols/
+        schema.json
+        col_000.npy
+        col_001.npy
+        ...
+
+Categorical text columns are stored as int8/int16 codes with their vocabulary
+in the schema. The CSV files are still written for humans and for the app
+deployment, but the scripts read the bundle.
+"""
+
+import contextlib
+import json
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from common.atomic import atomic_directory
+
+SCHEMA_FILE = 'schema.json'
+
+# Explicit dtypes for the two pipeline tables. Columns not listed here get a
+# compact dtype inferred from the data (see infer_dtype).
+CLEANED_SCHEMA = {
+    'instant': 'int32',
+    'dteday': 'datetime64[ns]',
+    'season': 'category',
+    'yr': 'category',
+    'mnth': 'category',
+    'hr': 'int8',
+    'holiday': 'category',
+    'weekday': 'int8',
+    'workingday': 'category',
+    'weathersit': 'category',
+    'temp': 'float32',
+    'atemp': 'float32',
+    'hum': 'float32',
+    'windspeed': 'float32',
+    'casual': 'float32',
+    'registered': 'float32',
+    'cnt': 'int32',
+}
+
+PROCESSED_SCHEMA = {
+    'yr': 'int8',
+    'mnth': 'int8',
+    'hr': 'int8',
+    'holiday': 'int8',
+    'weekday': 'int8',
+    'workingday': 'int8',
+    'temp': 'float32',
+    'atemp': 'float32',
+    'hum': 'float32',
+    'windspeed': 'float32',
+    'casual': 'float32',
+    'registered': 'float32',
+    'cnt': 'int32',
+    'hr_sin': 'float32',
+    'hr_cos': 'float32',
+    'mnth_sin': 'float32',
+    'mnth_cos': 'float32',
+    'weekday_sin': 'float32',
+    'weekday_cos': 'float32',
+}
+
+
+def bundle_path(csv_path):
+    """cleaned_bike_data.csv -> cleaned_bike_data.cols"""
+    return os.path.splitext(csv_path)[0] + '.cols'
+
+
+def infer_dtype(series):
+    """Pick the smallest dtype that holds the column"""
+    if pd.api.types.is_bool_dtype(series):
+        return 'bool'
+    if pd.api.types.is_datetime64_any_dtype(series):
+        return 'datetime64[ns]'
+    if pd.api.types.is_integer_dtype(series):
+        lo, hi = (series.min(), series.max()) if len(series) else (0, 0)
+        for dtype in ('int8', 'int16', 'int32'):
+            info = np.iinfo(dtype)
+            if info.min <= lo and hi <= info.max:
+                return dtype
+        return 'int64'
+    if pd.api.types.is_float_dtype(series):
+        return 'float32'
+    return 'category'
+
+
+def _encode_column(series, dtype):
+    """Convert a column to (array, extra schema fields)"""
+    if dtype == 'category':
+        cat = pd.Categorical(series)
+        codes = cat.codes
+        codes_dtype = 'int8' if len(cat.categories) < 127 else 'int16'
+        categories = [c.item() if hasattr(c, 'item') else c for c in cat.categories]
+        return codes.astype(codes_dtype), {'categories': categories}
+
+    if dtype.startswith('datetime64'):
+        return pd.to_datetime(series).to_numpy(dtype=dtype), {}
+
+    if dtype.startswith('int') and series.isnull().any():
+        raise ValueError(f"Column '{series.name}' has missing values and cannot be stored as {dtype}")
+    return series.to_numpy().astype(dtype), {}
+
+
+def save_table(df, path, schema=None, source=None):
+    """Write df as a columnar bundle at path (replacing any previous bundle atomically)"""
+    schema = schema or {}
+    with atomic_directory(path) as tmp:
+        columns = []
+        for i, col in enumerate(df.columns):
+            dtype = schema.get(col) or infer_dtype(df[col])
+            values, extra = _encode_column(df[col], dtype)
+            filename = f'col_{i:03d}.npy'
+            np.save(os.path.join(tmp, filename), np.ascontiguousarray(values))
+            columns.append({'name': col, 'dtype': dtype, 'file': filename, **extra})
+
+        meta = {'n_rows': len(df), 'columns': columns}
+        if source is not None:
+            meta['source'] = source
+        with open(os.path.join(tmp, SCHEMA_FILE), 'w', encoding='utf-8') as f:
+            json.dump(meta, f, indent=2)
+
+
+class _ChunkedBundle:
+    """Columns appended chunk by chunk to raw files, turned into .npy on finish"""
+
+    BLOCK = 1 << 20
+
+    def __init__(self, path, schema):
+        self.path = path
+        self.schema = schema
+        self.columns = None
+        self.n_rows = 0
+        self.source = None
+
+    def _start(self, df):
+        self.columns = []
+        for i, col in enumerate(df.columns):
+            dtype = self.schema.get(col) or infer_dtype(df[col])
+            # Inferred widths from one chunk may not hold later chunks
+            if dtype.startswith('int') and col not in self.schema:
+                dtype = 'int64'
+            self.columns.append({'name': col, 'dtype': dtype, 'file': f'col_{i:03d}.npy'})
+        # Categorical columns: value -> provisional code, in order of appearance
+        self.vocab = {c['name']: {} for c in self.columns if c['dtype'] == 'category'}
+        self.raw = {c['name']: open(os.path.join(self.path, c['file'] + '.raw'), 'wb')
+                    for c in self.columns}
+
+    def append(self, df):
+        if self.columns is None:
+            self._start(df)
+        for spec in self.columns:
+            name = spec['name']
+            if spec['dtype'] == 'category':
+                vocab = self.vocab[name]
+                codes, uniques = pd.factorize(df[name])
+                # Trailing -1 so missing values (code -1) stay missing
+                lookup = np.array([vocab.setdefault(_plain(u), len(vocab)) for u in uniques] + [-1],
+                                  dtype=np.int32)
+                values = lookup[codes]
+            else:
+                values, _ = _encode_column(df[name], spec['dtype'])
+            np.ascontiguousarray(values).tofile(self.raw[name])
+        self.n_rows += len(df)
+
+    def close_raw(self):
+        for f in (self.raw.values() if self.columns is not None else []):
+            f.close()
+
+    def finish(self):
+        columns = []
+        for spec in self.columns or []:
+            raw_path = os.path.join(self.path, spec['file'] + '.raw')
+            extra = {}
+            if spec['dtype'] == 'category':
+                categories, remap = _sorted_categories(self.vocab[spec['name']])
+                raw_dtype = np.dtype(np.int32)
+                out_dtype = np.dtype('int8' if len(categories) < 127 else 'int16')
+                remap = np.append(remap, -1).astype(out_dtype)
+                extra['categories'] = categories
+            else:
+                raw_dtype = out_dtype = np.dtype(spec['dtype'])
+            out = np.lib.format.open_memmap(os.path.join(self.path, spec['file']), mode='w+',
+                                            dtype=out_dtype, shape=(self.n_rows,))
+            if self.n_rows:
+                raw = np.memmap(raw_path, dtype=raw_dtype, mode='r', shape=(self.n_rows,))
+                for start in range(0, self.n_rows, self.BLOCK):
+                    block = raw[start:start + self.BLOCK]
+                    out[start:start + self.BLOCK] = remap[block] if extra else block
+                del raw
+            out.flush()
+            del out
+            os.remove(raw_path)
+            columns.append({**spec, **extra})
+
+        meta = {'n_rows': self.n_rows, 'columns': columns}
+        if self.source is not None:
+            meta['source'] = self.source
+        with open(os.path.join(self.path, SCHEMA_FILE), 'w', encoding='utf-8') as f:
+            json.dump(meta, f, indent=2)
+
+
+def _plain(value):
+    """Python scalar for a categorical value (2011.0 -> 2011, numpy -> builtin)"""
+    value = value.item() if hasattr(value, 'item') else value
+    if isinstance(value, float) and value.is_integer():
+        return int(value)
+    return value
+
+
+def _sorted_categories(vocab):
+    """Final categories (sorted, as pd.Categorical) and provisional -> final codes.
+
+    Chunks are typed separately, so a column can be numeric in one chunk and
+    text in another; as with a single read_csv, any text makes it all text.
+    """
+    values = list(vocab)
+    if any(isinstance(v, str) for v in values):
+        values = [str(v) for v in values]
+    categories = sorted(set(values))
+    index = {value: i for i, value in enumerate(categories)}
+    return categories, np.array([index[v] for v in values], dtype=np.int64)
+
+
+@contextlib.contextmanager
+def bundle_writer(path, schema=None):
+    """Write a bundle from DataFrame chunks with bounded memory.
+
+    Yields an object with append(df); set its .source before the block ends
+    to stamp the bundle. The bundle replaces path atomically on success.
+    """
+    with atomic_directory(path) as tmp:
+        bundle = _ChunkedBundle(tmp, schema or {})
+        try:
+            yield bundle
+        finally:
+            bundle.close_raw()
+        bundle.finish()
+
+
+def read_schema(path):
+    with open(os.path.join(path, SCHEMA_FILE), 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def read_columns(path):
+    """Column names of a bundle, without touching the data files"""
+    return [c['name'] for c in read_schema(path)['columns']]
+
+
+def load_arrays(path, columns=None, mmap=True):
+    """Raw column arrays keyed by name; memory-mapped (read-only) by default.
+
+    Categorical columns come back as their integer codes.
+    """
+    meta = read_schema(path)
+    by_name = {c['name']: c for c in meta['columns']}
+    names = columns if columns is not None else list(by_name)
+    mmap_mode = 'r' if mmap else None
+    return {name: np.load(os.path.join(path, by_name[name]['file']), mmap_mode=mmap_mode)
+            for name in names}
+
+
+def load_table(path, columns=None, as_category=True, rows=None):
+    """Load a bundle (or a subset of its columns / a slice of its rows) as a DataFrame"""
+    meta = read_schema(path)
+    by_name = {c['name']: c for c in meta['columns']}
+    names = columns if columns is not None else list(by_name)
+    missing = [name for name in names if name not in by_name]
+    if missing:
+        raise KeyError(f"Columns not in {path}: {missing}")
+
+    arrays = load_arrays(path, names)
+    data = {}
+    for name in names:
+        spec = by_name[name]
+        values = arrays[name] if rows is None else arrays[name][rows]
+        if spec['dtype'] == 'category':
+            cat = pd.Categorical.from_codes(np.asarray(values), categories=spec['categories'])
+            data[name] = cat if as_category else np.asarray(cat, dtype=object)
+        else:
+            data[name] = values
+    return pd.DataFrame(data, columns=names)
+
+
+def _csv_stamp(csv_path):
+    stat = os.stat(csv_path)
+    return {'csv': os.path.basename(csv_path), 'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns}
+
+
+def write_bike_table(df, csv_path, schema=None):
+    """Write the CSV export and its columnar bundle side by side"""
+    df.to_csv(csv_path, index=False)
+    save_table(df, bundle_path(csv_path), schema, source=_csv_stamp(csv_path))
+
+
+@contextlib.contextmanager
+def bike_table_writer(csv_path, schema=None):
+    """Chunked write_bike_table: yields append(df), which adds df to the CSV and the bundle"""
+    with bundle_writer(bundle_path(csv_path), schema) as bundle:
+        with open(csv_path, 'w', encoding='utf-8', newline='') as f:
+            def append(df):
+                df.to_csv(f, index=False, header=bundle.columns is None)
+                bundle.append(df)
+            yield append
+        bundle.source = _csv_stamp(csv_path)
+
+
+def read_bike_table(csv_path, schema=None, columns=None, as_category=True):
+    """Load a pipeline table from its bundle.
+
+    If the bundle is missing or older than the CSV (e.g. the CSV was edited or
+    checked out), the CSV is parsed once and the bundle is rebuilt.
+    """
+    path = bundle_path(csv_path)
+    current = False
+    if os.path.exists(os.path.join(path, SCHEMA_FILE)):
+        source = read_schema(path).get('source')
+        current = not os.path.exists(csv_path) or source == _csv_stamp(csv_path)
+
+    if not current:
+        df = pd.read_csv(csv_path)
+        save_table(df, path, schema, source=_csv_stamp(csv_path))
+
+    return load_table(path, columns=columns, as_category=as_category)
@@ -1,3 +1,4 @@
+import argparse
 import pandas as pd
 import numpy as np
 import matplotlib
@@ -5,78 +6,174 @@ matplotlib.use('Agg')
 import matplotlib.pyplot as plt
 import seaborn as sns
 import os
+from bike_store import write_bike_table, bike_table_writer, CLEANED_SCHEMA
+from quantile_sketch import KLLSketch
 
-if not os.path.exists('images'):
-    os.makedirs('images')
+cols_to_fix = ['temp', 'atemp', 'hum', 'windspeed', 'casual', 'registered']
+weather_cols = ['temp', 'atemp', 'hum', 'windspeed']
 
-# Load
-df = pd.read_csv('Dataset.csv', encoding='latin1')
-print(f"Original shape: {df.shape}")
 
-# 1. Fix Date
-# Format appears to be DD-MM-YYYY
-df['dteday'] = pd.to_datetime(df['dteday'], dayfirst=True, errors='coerce')
-print(f"Date conversion complete. Missing dates: {df['dteday'].isnull().sum()}")
+def fix_types(df):
+    # 1. Fix Date
+    # Format appears to be DD-MM-YYYY
+    df['dteday'] = pd.to_datetime(df['dteday'], dayfirst=True, errors='coerce')
 
-# 2. Fix Numeric Columns
-cols_to_fix = ['temp', 'atemp', 'hum', 'windspeed', 'casual', 'registered']
-for col in cols_to_fix:
-    # Coerce to numeric, turning '?' into NaN
-    df[col] = pd.to_numeric(df[col], errors='coerce')
-
-# 3. Smart Imputation
-# 3a. Casual/Registered
-# Check if casual is missing but registered and cnt are present
-mask_cas_missing = df['casual'].isnull() & df['registered'].notnull() & df['cnt'].notnull()
-df.loc[mask_cas_missing, 'casual'] = df.loc[mask_cas_missing, 'cnt'] - df.loc[mask_cas_missing, 'registered']
-
-# Check if registered is missing but casual and cnt are present
-mask_reg_missing = df['registered'].isnull() & df['casual'].notnull() & df['cnt'].notnull()
-df.loc[mask_reg_missing, 'registered'] = df.loc[mask_reg_missing, 'cnt'] - df.loc[mask_reg_missing, 'casual']
-
-# If both missing? (Unlikely)
-mask_both = df['casual'].isnull() & df['registered'].isnull()
-if mask_both.sum() > 0:
-    print(f"Rows with both casual and registered missing: {mask_both.sum()}")
-    # Drop or impute? Drop for now as it's < 1%
-    df = df[~mask_both]
-
-# 3b. Weather cols
-# Impute with median
-weather_cols = ['temp', 'atemp', 'hum', 'windspeed']
-for col in weather_cols:
-    if df[col].isnull().sum() > 0:
-        median_val = df[col].median()
-        df[col].fillna(median_val, inplace=True)
-        print(f"Imputed {col} with median: {median_val}")
-
-print("\nMissing values after imputation:")
-print(df.isnull().sum()[df.isnull().sum() > 0])
-
-# 4. Save
-df.to_csv('cleaned_bike_data.csv', index=False)
-print("Saved cleaned_bike_data.csv")
-
-# 5. Visualizations on CLEAN data
-# Correlation
-plt.figure(figsize=(12, 10))
-numeric_df = df.select_dtypes(include=[np.number])
-sns.heatmap(numeric_df.corr(), annot=True, fmt='.2f', cmap='coolwarm')
-plt.title('Correlation Matrix (Cleaned)')
-plt.savefig('images/correlation_matrix_final.png')
-
-# Monthly trend
-plt.figure(figsize=(12, 6))
-# Extract month if needed
-df['month_name'] = df['dteday'].dt.month_name()
-# Group by month (need sorting)
-# simpler: use 'mnth' column if it aligns, but let's use datetime
-monthly_cnt = df.groupby(df['dteday'].dt.to_period('M'))['cnt'].sum()
-monthly_cnt.plot(kind='line')
-plt.title('Total Bike Rentals Over Time')
-plt.ylabel('Count')
-plt.xlabel('Date')
-plt.tight_layout()
-plt.savefig('images/time_series_trend.png')
-
-print("EDA Analysis complete. Images saved.")
+    # 2. Fix Numeric Columns
+    for col in cols_to_fix:
+        # Coerce to numeric, turning '?' into NaN
+        df[col] = pd.to_numeric(df[col], errors='coerce')
+    return df
+
+
+def impute_casual_registered(df):
+    # 3a. Casual/Registered
+    # Check if casual is missing but registered and cnt are present
+    mask_cas_missing = df['casual'].isnull() & df['registered'].notnull() & df['cnt'].notnull()
+    df.loc[mask_cas_missing, 'casual'] = df.loc[mask_cas_missing, 'cnt'] - df.loc[mask_cas_missing, 'registered']
+
+    # Check if registered is missing but casual and cnt are present
+    mask_reg_missing = df['registered'].isnull() & df['casual'].notnull() & df['cnt'].notnull()
+    df.loc[mask_reg_missing, 'registered'] = df.loc[mask_reg_missing, 'cnt'] - df.loc[mask_reg_missing, 'casual']
+
+    # If both missing? (Unlikely)
+    mask_both = df['casual'].isnull() & df['registered'].isnull()
+    if mask_both.sum() > 0:
+        print(f"Rows with both casual and registered missing: {mask_both.sum()}")
+        # Drop or impute? Drop for now as it's < 1%
+        df = df[~mask_both]
+    return df
+
+
+def plot_results(corr, monthly_cnt):
+    # Correlation
+    plt.figure(figsize=(12, 10))
+    sns.heatmap(corr, annot=True, fmt='.2f', cmap='coolwarm')
+    plt.title('Correlation Matrix (Cleaned)')
+    plt.savefig('images/correlation_matrix_final.png')
+
+    # Monthly trend
+    plt.figure(figsize=(12, 6))
+    monthly_cnt.plot(kind='line')
+    plt.title('Total Bike Rentals Over Time')
+    plt.ylabel('Count')
+    plt.xlabel('Date')
+    plt.tight_layout()
+    plt.savefig('images/time_series_trend.png')
+
+
+def clean_in_memory(input_path, output_path):
+    """Original flow: load everything, clean, save, plot"""
+    df = pd.read_csv(input_path, encoding='latin1')
+    print(f"Original shape: {df.shape}")
+
+    df = fix_types(df)
+    print(f"Date conversion complete. Missing dates: {df['dteday'].isnull().sum()}")
+
+    # 3. Smart Imputation
+    df = impute_casual_registered(df)
+
+    # 3b. Weather cols
+    # Impute with median
+    for col in weather_cols:
+        if df[col].isnull().sum() > 0:
+            median_val = df[col].median()
+            df[col].fillna(median_val, inplace=True)
+            print(f"Imputed {col} with median: {median_val}")
+
+    print("\nMissing values after imputation:")
+    print(df.isnull().sum()[df.isnull().sum() > 0])
+
+    # 4. Save
+    write_bike_table(df, output_path, CLEANED_SCHEMA)
+    print(f"Saved {output_path}")
+
+    # 5. Visualizations on CLEAN data
+    numeric_df = df.select_dtypes(include=[np.number])
+    monthly_cnt = df.groupby(df['dteday'].dt.to_period('M'))['cnt'].sum()
+    plot_results(numeric_df.corr(), monthly_cnt)
+
+
+def clean_streaming(input_path, output_path, chunksize):
+    """Two-pass chunked cleaning for inputs that do not fit in memory.
+
+    Pass 1 sketches the weather-column medians; pass 2 imputes and appends
+    each chunk to the output CSV and its column bundle. Peak memory is one
+    chunk plus the sketches.
+    """
+    # --- Pass 1: median sketches ---
+    sketches = {col: KLLSketch(seed=42) for col in weather_cols}
+    n_rows = 0
+    for chunk in pd.read_csv(input_path, encoding='latin1', chunksize=chunksize,
+                             usecols=weather_cols):
+        for col in weather_cols:
+            sketches[col].update(pd.to_numeric(chunk[col], errors='coerce').to_numpy())
+        n_rows += len(chunk)
+    medians = {col: sketches[col].median() for col in weather_cols}
+    print(f"Pass 1: sketched medians over {n_rows:,} rows: {medians}")
+
+    # --- Pass 2: impute and write incrementally ---
+    missing_dates = 0
+    imputed = dict.fromkeys(weather_cols, 0)
+    monthly_cnt = pd.Series(dtype='float64')
+    # Running moments for the correlation matrix
+    corr_cols, count, sums, cross = None, 0, None, None
+
+    with bike_table_writer(output_path, CLEANED_SCHEMA) as append:
+        for chunk in pd.read_csv(input_path, encoding='latin1', chunksize=chunksize):
+            chunk = fix_types(chunk)
+            missing_dates += chunk['dteday'].isnull().sum()
+            chunk = impute_casual_registered(chunk)
+            for col in weather_cols:
+                imputed[col] += chunk[col].isnull().sum()
+                chunk[col] = chunk[col].fillna(medians[col])
+
+            append(chunk)
+
+            monthly = chunk.groupby(chunk['dteday'].dt.to_period('M'))['cnt'].sum()
+            monthly_cnt = monthly_cnt.add(monthly, fill_value=0)
+
+            if corr_cols is None:
+                corr_cols = chunk.select_dtypes(include=[np.number]).columns.tolist()
+                sums = np.zeros(len(corr_cols))
+                cross = np.zeros((len(corr_cols), len(corr_cols)))
+            values = chunk[corr_cols].apply(pd.to_numeric, errors='coerce').dropna().to_numpy(dtype=np.float64)
+            count += len(values)
+            sums += values.sum(axis=0)
+            cross += values.T @ values
+
+    print(f"Pass 2: wrote {output_path}. Missing dates: {missing_dates}")
+    for col in weather_cols:
+        if imputed[col] > 0:
+            print(f"Imputed {imputed[col]} values of {col} with median: {medians[col]}")
+
+    # Correlation from the accumulated moments
+    mean = sums / count
+    cov = cross / count - np.outer(mean, mean)
+    std = np.sqrt(np.diag(cov))
+    with np.errstate(invalid='ignore', divide='ignore'):
+        corr = pd.DataFrame(cov / np.outer(std, std), index=corr_cols, columns=corr_cols)
+    plot_results(corr, monthly_cnt.sort_index())
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Clean the bike sharing dataset.")
+    parser.add_argument('--input', default='Dataset.csv')
+    parser.add_argument('--output', default='cleaned_bike_data.csv')
+    parser.add_argument('--stream', action='store_true',
+                        help="Process the input in chunks with bounded memory.")
+    parser.add_argument('--chunksize', type=int, default=100_000)
+    args = parser.parse_args()
+
+    if not os.path.exists('images'):
+        os.makedirs('images')
+
+    if args.stream:
+        clean_streaming(args.input, args.output, args.chunksize)
+    else:
+        clean_in_memory(args.input, args.output)
+
+    print("EDA Analysis complete. Images saved.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,45 @@
+"""
+Shared fixtures: the committed cleaned/processed tables and a transformer
+fitted on them exactly as feature_engineering_v2.py fits it.
+"""
+
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.preprocessing import MinMaxScaler
+
+from bike_features import BikeFeatureTransformer, CategoricalEncoder, VALUE_MAPS
+
+PROJECT_DIR = os.path.dirname(os.path.abspath(__file__))
+SCALE_COLS = ['temp', 'atemp', 'hum', 'windspeed']
+TARGET_COLS = ['casual', 'registered', 'cnt']
+
+
+@pytest.fixture(scope='session')
+def cleaned():
+    return pd.read_csv(os.path.join(PROJECT_DIR, 'cleaned_bike_data.csv'))
+
+
+@pytest.fixture(scope='session')
+def processed():
+    return pd.read_csv(os.path.join(PROJECT_DIR, 'processed_bike_data.csv'))
+
+
+@pytest.fixture(scope='session')
+def transformer(cleaned):
+    """Fitted the way feature_engineering_v2.py fits it"""
+    df = cleaned.copy()
+    df['dteday'] = pd.to_datetime(df['dteday'])
+    df['mnth'] = df['dteday'].dt.month
+    df['yr'] = df['dteday'].dt.year.map(VALUE_MAPS['yr'])
+    for col in ['hr', 'weekday']:
+        df[col] = pd.to_numeric(df[col], errors='coerce').fillna(0).astype(int)
+    encoder = CategoricalEncoder()
+    df = encoder.fit_transform(df)
+    scaler = MinMaxScaler()
+    df[SCALE_COLS] = scaler.fit_transform(df[SCALE_COLS].astype(np.float32))
+    df = df.drop(columns=['dteday', 'instant'])
+    columns = [c for c in df.columns if c not in TARGET_COLS]
+    return BikeFeatureTransformer.fit(columns, encoder, scaler, SCALE_COLS, data=df)
@@ -0,0 +1,104 @@
+"""
+Feature Store for the Bike Sharing Models
+Materializes the train/test split of processed_bike_data once as float32
+.npy files. Scripts and worker processes memory-map the same files, so nobody
+re-parses the table or repeats drop() / train_test_split().
+
+    feature_store/<split>/
+        meta.json              columns, target, source stamp
+        X_train.npy  X_test.npy  y_train.npy  y_test.npy
+        train_idx.npy  test_idx.npy   (row positions in processed_bike_data)
+
+Named splits:
+    random  train_test_split(test_size=0.2, random_state=42), as before
+    time    train on 2011 (yr == 0), test on 2012 (yr == 1)
+"""
+
+import json
+import os
+
+import numpy as np
+import pandas as pd
+from sklearn.model_selection import train_test_split
+from bike_store import atomic_directory, read_bike_table, read_schema, bundle_path, PROCESSED_SCHEMA
+
+STORE_DIR = 'feature_store'
+SOURCE_CSV = 'processed_bike_data.csv'
+TARGET = 'cnt'
+DROP_COLS = ['casual', 'registered', 'cnt']
+SPLITS = ['random', 'time']
+ARRAYS = ['X_train', 'X_test', 'y_train', 'y_test', 'train_idx', 'test_idx']
+
+
+class Split:
+    """Read-only, memory-mapped view of one materialized split"""
+
+    def __init__(self, path):
+        self.path = path
+        with open(os.path.join(path, 'meta.json'), 'r', encoding='utf-8') as f:
+            self.meta = json.load(f)
+        self.name = self.meta['name']
+        self.columns = self.meta['columns']
+        for key in ARRAYS:
+            setattr(self, key, np.load(os.path.join(path, key + '.npy'), mmap_mode='r'))
+
+    def model_input(self, model, X):
+        """X as the model was fitted: a DataFrame with the split's column names
+        if the model recorded feature names, else the array itself (either
+        mismatch makes sklearn warn on every predict)"""
+        if hasattr(model, 'feature_names_in_'):
+            return pd.DataFrame(X, columns=self.columns)
+        return X
+
+
+def _split_indices(name, df):
+    n = len(df)
+    if name == 'random':
+        return train_test_split(np.arange(n), test_size=0.2, random_state=42)
+    if name == 'time':
+        yr = df['yr'].to_numpy()
+        return np.flatnonzero(yr == 0), np.flatnonzero(yr == 1)
+    raise ValueError(f"Unknown split '{name}', expected one of {SPLITS}")
+
+
+def _source_stamp():
+    return read_schema(bundle_path(SOURCE_CSV)).get('source')
+
+
+def materialize(name='random', df=None):
+    """Write one named split to the store and return it"""
+    if df is None:
+        df = read_bike_table(SOURCE_CSV, PROCESSED_SCHEMA)
+    path = os.path.join(STORE_DIR, name)
+
+    columns = [c for c in df.columns if c not in DROP_COLS]
+    X = df[columns].to_numpy(dtype=np.float32)
+    y = df[TARGET].to_numpy(dtype=np.float32)
+    train_idx, test_idx = _split_indices(name, df)
+
+    arrays = {
+        'X_train': X[train_idx], 'X_test': X[test_idx],
+        'y_train': y[train_idx], 'y_test': y[test_idx],
+        'train_idx': train_idx.astype(np.int32), 'test_idx': test_idx.astype(np.int32),
+    }
+    meta = {'name': name, 'columns': columns, 'target': TARGET,
+            'n_train': len(train_idx), 'n_test': len(test_idx), 'source': _source_stamp()}
+    with atomic_directory(path) as tmp:
+        for key, values in arrays.items():
+            np.save(os.path.join(tmp, key + '.npy'), np.ascontiguousarray(values))
+        with open(os.path.join(tmp, 'meta.json'), 'w', encoding='utf-8') as f:
+            json.dump(meta, f, indent=2)
+    return Split(path)
+
+
+def load_split(name='random'):
+    """Attach to a split, materializing it first if missing or stale"""
+    path = os.path.join(STORE_DIR, name)
+    meta_path = os.path.join(path, 'meta.json')
+    if os.path.exists(meta_path):
+        # Make sure the bundle reflects the current CSV before comparing stamps
+        read_bike_table(SOURCE_CSV, PROCESSED_SCHEMA, columns=[TARGET])
+        with open(meta_path, 'r', encoding='utf-8') as f:
+            if json.load(f).get('source') == _source_stamp():
+                return Split(path)
+    return materialize(name)
@@ -0,0 +1,198 @@
+"""
+Compiled Forest Export
+Flattens a fitted sklearn forest (or single tree) into contiguous arrays and
+evaluates it with NumPy only:
+
+    best_random_forest.forest/
+        meta.json       n_trees, max_depth, n_features, columns
+        roots.npy       int32   first node of each tree
+        feature.npy     int16   split feature per node (0 for leaves)
+        threshold.npy   float32 split threshold per node (+inf for leaves)
+        children.npy    int32   (n_nodes, 2) left/right node; leaves point to themselves
+        value.npy       float32 node prediction (used at leaves)
+
+The files are memory-mapped on load, so opening the model does not unpickle
+anything. Thresholds are rounded down to float32, which keeps every
+x <= threshold decision identical to sklearn (sklearn casts X to float32).
+
+The compiled forest is for the app: instant load and sub-millisecond single
+rows. On large batches sklearn's compiled traversal is still somewhat faster
+(see the benchmark printed below), so batch_score.py and prediction_grid.py
+default to the .joblib model.
+
+Usage:
+    python forest_compiler.py [--model models/best_random_forest.joblib]
+"""
+
+import argparse
+import json
+import os
+import time
+
+import numpy as np
+
+ARRAYS = ['roots', 'feature', 'threshold', 'children', 'value']
+
+
+def compile_forest(model):
+    """Flat arrays (dict) for a fitted RandomForestRegressor / DecisionTreeRegressor"""
+    estimators = getattr(model, 'estimators_', [model])
+    roots, feature, threshold, children, value = [], [], [], [], []
+    offset = 0
+    max_depth = 0
+    for est in estimators:
+        tree = est.tree_
+        n = tree.node_count
+        leaf = tree.children_left == -1
+        ids = np.arange(offset, offset + n, dtype=np.int64)
+
+        left = np.where(leaf, ids, tree.children_left + offset)
+        right = np.where(leaf, ids, tree.children_right + offset)
+
+        # Largest float32 <= threshold: for float32 inputs, x <= t32 iff x <= t
+        thr = tree.threshold.astype(np.float32)
+        too_big = thr.astype(np.float64) > tree.threshold
+        thr[too_big] = np.nextafter(thr[too_big], np.float32(-np.inf))
+        thr[leaf] = np.inf
+
+        roots.append(offset)
+        feature.append(np.where(leaf, 0, tree.feature).astype(np.int16))
+        threshold.append(thr)
+        children.append(np.stack([left, right], axis=1).astype(np.int32))
+        value.append(tree.value[:, 0, 0].astype(np.float32))
+        offset += n
+        max_depth = max(max_depth, tree.max_depth)
+
+    return {
+        'roots': np.asarray(roots, dtype=np.int32),
+        'feature': np.concatenate(feature),
+        'threshold': np.concatenate(threshold),
+        'children': np.concatenate(children),
+        'value': np.concatenate(value),
+    }, {
+        'n_trees': len(estimators),
+        'max_depth': int(max_depth),
+        'n_features': int(model.n_features_in_),
+        'n_nodes': int(offset),
+        'columns': [str(c) for c in getattr(model, 'feature_names_in_', [])],
+    }
+
+
+def save_compiled(model, path):
+    # Build-time only; the app imports this module without bike_store
+    from bike_store import atomic_directory
+
+    arrays, meta = compile_forest(model)
+    with atomic_directory(path) as tmp:
+        for key in ARRAYS:
+            np.save(os.path.join(tmp, key + '.npy'), np.ascontiguousarray(arrays[key]))
+        with open(os.path.join(tmp, 'meta.json'), 'w', encoding='utf-8') as f:
+            json.dump(meta, f, indent=2)
+    return CompiledForest(path)
+
+
+class CompiledForest:
+    """Vectorized evaluator over the flat arrays; predict() mirrors sklearn's"""
+
+    def __init__(self, path, mmap=True):
+        self.path = path
+        with open(os.path.join(path, 'meta.json'), 'r', encoding='utf-8') as f:
+            self.meta = json.load(f)
+        mmap_mode = 'r' if mmap else None
+        for key in ARRAYS:
+            # Plain ndarray views of the maps: np.memmap adds overhead to every take()
+            setattr(self, key, np.asarray(np.load(os.path.join(path, key + '.npy'), mmap_mode=mmap_mode)))
+        self.n_trees = self.meta['n_trees']
+        self.max_depth = self.meta['max_depth']
+
+    def predict(self, X, batch_cells=1 << 20, compact_every=4):
+        """Mean leaf value over trees; rows are processed in blocks so the
+        (rows x trees) cell arrays stay around batch_cells entries.
+
+        Cells are ordered tree by tree, so consecutive gathers stay inside one
+        tree's nodes. Leaves point to themselves, and every compact_every
+        steps the cells that reached a leaf are recorded and dropped, so
+        deep paths no longer drag the finished cells along."""
+        X = np.ascontiguousarray(X, dtype=np.float32)
+        if X.ndim == 1:
+            X = X[None, :]
+        n_rows, n_features = X.shape
+        out = np.empty(n_rows, dtype=np.float64)
+        block = max(1, batch_cells // self.n_trees)
+        children = self.children.reshape(-1)
+
+        for start in range(0, n_rows, block):
+            Xb = X[start:start + block].reshape(-1)
+            rows = len(Xb) // n_features
+            node = np.repeat(self.roots.astype(np.intp), rows)
+            offset = np.tile(np.arange(0, rows * n_features, n_features, dtype=np.intp), self.n_trees)
+            cell = np.arange(len(node))
+            leaf_node = node.copy()
+            for step in range(1, self.max_depth + 1):
+                go_right = Xb.take(offset + self.feature.take(node)) > self.threshold.take(node)
+                node = children.take(2 * node + go_right)
+                if step % compact_every and step < self.max_depth:
+                    continue
+                done = children.take(2 * node) == node
+                leaf_node[cell[done]] = node[done]
+                active = ~done
+                node, offset, cell = node[active], offset[active], cell[active]
+                if not len(node):
+                    break
+            values = self.value.take(leaf_node).reshape(self.n_trees, rows)
+            out[start:start + rows] = values.mean(axis=0, dtype=np.float64)
+        return out
+
+    def artifact_bytes(self):
+        return sum(os.path.getsize(os.path.join(self.path, key + '.npy')) for key in ARRAYS)
+
+
+def main():
+    import joblib
+    from feature_store import load_split
+
+    parser = argparse.ArgumentParser(description="Compile a fitted forest into flat arrays.")
+    parser.add_argument('--model', default='models/best_random_forest.joblib')
+    parser.add_argument('--output', default=None,
+                        help="Output directory (default: <model>.forest).")
+    args = parser.parse_args()
+    output = args.output or os.path.splitext(args.model)[0] + '.forest'
+
+    start = time.perf_counter()
+    model = joblib.load(args.model)
+    joblib_load = time.perf_counter() - start
+
+    compiled = save_compiled(model, output)
+    start = time.perf_counter()
+    compiled = CompiledForest(output)
+    compiled_load = time.perf_counter() - start
+    print(f"Compiled {compiled.n_trees} trees ({compiled.meta['n_nodes']:,} nodes, "
+          f"max depth {compiled.max_depth}) to {output}")
+
+    # Check against sklearn on the held-out split
+    X_test = load_split('random').X_test
+    expected = model.predict(X_test)
+    got = compiled.predict(X_test)
+    max_diff = float(np.abs(expected - got).max())
+    print(f"Max abs difference vs sklearn on {len(X_test):,} rows: {max_diff:.2e}")
+    if not np.allclose(expected, got, rtol=1e-4, atol=1e-3):
+        raise SystemExit("Compiled forest does not match sklearn predictions.")
+
+    def latency(predict, X, repeat=20):
+        best = float('inf')
+        for _ in range(repeat):
+            t = time.perf_counter()
+            predict(X)
+            best = min(best, time.perf_counter() - t)
+        return best * 1000
+
+    row = X_test[:1]
+    print(f"\n{'':<10} {'Size MB':>9} {'Load ms':>9} {'1 row ms':>9} {'Batch ms':>9}")
+    print(f"{'sklearn':<10} {os.path.getsize(args.model) / 1e6:>9.1f} {joblib_load * 1000:>9.1f} "
+          f"{latency(model.predict, row):>9.2f} {latency(model.predict, X_test, 3):>9.1f}")
+    print(f"{'compiled':<10} {compiled.artifact_bytes() / 1e6:>9.1f} {compiled_load * 1000:>9.1f} "
+          f"{latency(compiled.predict, row):>9.2f} {latency(compiled.predict, X_test, 3):>9.1f}")
+
+
+if __name__ == "__main__":
+    main()
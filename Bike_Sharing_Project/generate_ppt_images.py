@@ -6,14 +6,17 @@ import matplotlib.pyplot as plt
 import seaborn as sns
 import joblib
 import os
-from sklearn.model_selection import train_test_split
+from bike_store import read_bike_table, CLEANED_SCHEMA
+from feature_store import load_split
 
 if not os.path.exists('images'):
     os.makedirs('images')
 
 # Load the cleaned and processed data
-df_clean = pd.read_csv('cleaned_bike_data.csv')
-df_proc = pd.read_csv('processed_bike_data.csv')
+# Only the columns used by the plots are mapped from the cleaned table
+clean_cols = ['cnt', 'hr', 'season', 'weathersit', 'temp', 'workingday', 'holiday']
+df_clean = read_bike_table('cleaned_bike_data.csv', CLEANED_SCHEMA, columns=clean_cols)
+split = load_split('random')
 model = joblib.load('models/best_random_forest.joblib')
 
 # --- 1. Rental Distribution ---
@@ -56,11 +59,8 @@ plt.title('Rentals: Working Day vs Holiday comparison')
 plt.savefig('images/workingday_holiday.png')
 
 # --- 7. Residual Plot (Actual vs Predicted) ---
-target = 'cnt'
-X = df_proc.drop(columns=['casual', 'registered', 'cnt'], errors='ignore')
-y = df_proc[target]
-X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
-y_pred = model.predict(X_test)
+X_test, y_test = split.X_test, split.y_test
+y_pred = model.predict(split.model_input(model, X_test))
 
 plt.figure(figsize=(10, 6))
 plt.scatter(y_test, y_pred, alpha=0.5, color='teal')
@@ -72,7 +72,7 @@ plt.savefig('images/actual_vs_predicted.png')
 
 # --- 8. Feature Importance (Rich version) ---
 importances = model.feature_importances_
-feature_names = X.columns
+feature_names = split.columns
 feature_df = pd.DataFrame({'Feature': feature_names, 'Importance': importances})
 feature_df = feature_df.sort_values(by='Importance', ascending=False)
 plt.figure(figsize=(10, 10))
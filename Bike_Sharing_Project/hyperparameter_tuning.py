@@ -1,25 +1,20 @@
+import argparse
+import heapq
+import json
+import time
+
 import pandas as pd
 import numpy as np
 import joblib
-from sklearn.model_selection import RandomizedSearchCV, train_test_split
+from sklearn.model_selection import RandomizedSearchCV, KFold, ParameterSampler
 from sklearn.ensemble import RandomForestRegressor
 from sklearn.metrics import mean_absolute_error, mean_squared_error, r2_score
+import matplotlib
+matplotlib.use('Agg')
 import matplotlib.pyplot as plt
+from feature_store import load_split, SPLITS
 
-# Load
-try:
-    df = pd.read_csv('processed_bike_data.csv')
-    print("Data loaded.")
-except FileNotFoundError:
-    print("Run preprocessing first.")
-    exit()
-
-target = 'cnt'
-drop_cols = ['casual', 'registered', 'cnt']
-X = df.drop(columns=drop_cols, errors='ignore')
-y = df[target]
-
-X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
+REPORT_PATH = 'models/tuning_report.json'
 
 # Grid for Random Search
 param_dist = {
@@ -30,48 +25,180 @@ param_dist = {
     'bootstrap': [True, False]
 }
 
-rf = RandomForestRegressor(random_state=42)
-
-print("Starting Randomized Search...")
-rf_random = RandomizedSearchCV(estimator=rf, param_distributions=param_dist, 
-                               n_iter=20, cv=3, verbose=2, random_state=42, n_jobs=-1)
-
-rf_random.fit(X_train, y_train)
-
-print("Best Parameters:", rf_random.best_params_)
-
-best_rf = rf_random.best_estimator_
-
-# Evaluation
-y_pred = best_rf.predict(X_test)
-
-mae = mean_absolute_error(y_test, y_pred)
-rmse = np.sqrt(mean_squared_error(y_test, y_pred))
-r2 = r2_score(y_test, y_pred)
-
-print("\n--- Optimized Model Performance ---")
-print(f"MAE:  {mae:.4f}")
-print(f"RMSE: {rmse:.4f}")
-print(f"R2:   {r2:.4f}")
-
-# Save best model
-joblib.dump(best_rf, 'models/best_random_forest.joblib')
-print("Saved best_random_forest.joblib")
-
-# Feature Importance
-importances = best_rf.feature_importances_
-feature_names = X.columns
-feature_df = pd.DataFrame({'Feature': feature_names, 'Importance': importances})
-feature_df = feature_df.sort_values(by='Importance', ascending=False)
-
-print("\nTop 5 Features:")
-print(feature_df.head())
 
-plt.figure(figsize=(10, 8))
-# Plot top 15
-import seaborn as sns
-sns.barplot(x='Importance', y='Feature', data=feature_df.head(15))
-plt.title('Feature Importance (Optimized RF)')
-plt.tight_layout()
-plt.savefig('images/feature_importance.png')
-print("Saved feature_importance.png")
+def rmse(y_true, y_pred):
+    return float(np.sqrt(mean_squared_error(y_true, y_pred)))
+
+
+def random_search(X_train, y_train):
+    """The original search: 20 candidates x 3 folds, every forest fit from scratch"""
+    rf = RandomForestRegressor(random_state=42)
+
+    print("Starting Randomized Search...")
+    rf_random = RandomizedSearchCV(estimator=rf, param_distributions=param_dist,
+                                   n_iter=20, cv=3, verbose=2, random_state=42, n_jobs=-1)
+    rf_random.fit(X_train, y_train)
+    return rf_random.best_estimator_, rf_random.best_params_
+
+
+def halving_search(X_train, y_train, n_candidates=27, eta=3, min_estimators=25, cv=3, seed=42):
+    """Successive halving with n_estimators as the resource.
+
+    Every candidate starts with a small forest on each fold; after each rung
+    only the best 1/eta survive and their forests are grown (warm_start adds
+    trees instead of refitting). Fold splits and arrays are built once.
+    """
+    max_estimators = max(param_dist['n_estimators'])
+    space = {k: v for k, v in param_dist.items() if k != 'n_estimators'}
+    candidates = list(ParameterSampler(space, n_candidates, random_state=seed))
+
+    # Cached fold arrays (contiguous float32, the dtype trees use internally)
+    X = np.ascontiguousarray(X_train, dtype=np.float32)
+    y = np.asarray(y_train, dtype=np.float64)
+    folds = [(X[tr], y[tr], X[va], y[va])
+             for tr, va in KFold(cv, shuffle=True, random_state=seed).split(X)]
+
+    alive = list(range(len(candidates)))
+    forests = {}
+    budget = min_estimators
+    rungs = []
+
+    print(f"Starting Successive Halving ({len(candidates)} candidates, eta={eta})...")
+    while True:
+        keep = 1 if budget >= max_estimators else max(1, len(alive) // eta)
+        rung_start = time.perf_counter()
+        scores = {}
+        best_heap = []  # (-score, i) of the current top `keep`
+        for i in alive:
+            fold_forests = forests.pop(i, None)
+            if fold_forests is None:
+                fold_forests = [RandomForestRegressor(warm_start=True, random_state=42, n_jobs=-1,
+                                                      **candidates[i]) for _ in folds]
+            fold_rmse = []
+            for rf, (X_tr, y_tr, X_va, y_va) in zip(fold_forests, folds):
+                rf.set_params(n_estimators=budget)
+                rf.fit(X_tr, y_tr)
+                fold_rmse.append(rmse(y_va, rf.predict(X_va)))
+            scores[i] = float(np.mean(fold_rmse))
+
+            # Only forests that can still survive this rung are kept in memory
+            heapq.heappush(best_heap, (-scores[i], i))
+            forests[i] = fold_forests
+            if len(best_heap) > keep:
+                _, dropped = heapq.heappop(best_heap)
+                del forests[dropped]
+
+        alive = sorted((i for _, i in best_heap), key=scores.get)
+        rungs.append({
+            'n_estimators': budget,
+            'candidates': len(scores),
+            'best_cv_rmse': scores[alive[0]],
+            'seconds': round(time.perf_counter() - rung_start, 3),
+        })
+        print(f"  rung {len(rungs)}: {len(scores)} candidates @ {budget} trees, "
+              f"best CV RMSE {scores[alive[0]]:.3f} ({rungs[-1]['seconds']:.1f}s)")
+
+        if budget >= max_estimators:
+            break
+        budget = min(budget * eta, max_estimators)
+
+    best_params = {**candidates[alive[0]], 'n_estimators': max_estimators}
+    forests.clear()
+
+    # Final model on the full training set
+    best_rf = RandomForestRegressor(random_state=42, n_jobs=-1, **best_params)
+    best_rf.fit(X, y)
+    return best_rf, best_params, rungs
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Tune the Random Forest.")
+    parser.add_argument('--search', choices=['random', 'halving'], default='random',
+                        help="Randomized search (original) or successive halving.")
+    parser.add_argument('--compare', action='store_true',
+                        help="Run both searches and report time and RMSE side by side.")
+    parser.add_argument('--split', choices=SPLITS, default='random',
+                        help="Named train/test split from the feature store.")
+    args = parser.parse_args()
+
+    # Load
+    try:
+        split = load_split(args.split)
+        print("Data loaded.")
+    except FileNotFoundError:
+        print("Run preprocessing first.")
+        exit()
+
+    X_train, X_test, y_train, y_test = split.X_train, split.X_test, split.y_train, split.y_test
+
+    searches = ['random', 'halving'] if args.compare else [args.search]
+    report = {}
+    chosen = None
+    for search in searches:
+        start = time.perf_counter()
+        if search == 'random':
+            model, params = random_search(X_train, y_train)
+            extra = {}
+        else:
+            model, params, rungs = halving_search(X_train, y_train)
+            extra = {'rungs': rungs}
+        seconds = time.perf_counter() - start
+        y_pred = model.predict(X_test)
+        report[search] = {'seconds': round(seconds, 3), 'test_rmse': rmse(y_test, y_pred),
+                          'best_params': params, **extra}
+        print(f"{search}: {seconds:.1f}s, test RMSE {report[search]['test_rmse']:.4f}")
+        if search == args.search:
+            chosen = (model, params)
+
+    best_rf, best_params = chosen
+    print("Best Parameters:", best_params)
+
+    if args.compare:
+        print("\n--- Search Comparison ---")
+        print(f"{'Search':<10} {'Seconds':>10} {'Test RMSE':>10}")
+        for search, row in report.items():
+            print(f"{search:<10} {row['seconds']:>10.1f} {row['test_rmse']:>10.4f}")
+        print(f"Halving speedup: {report['random']['seconds'] / report['halving']['seconds']:.1f}x")
+
+    # Evaluation
+    y_pred = best_rf.predict(X_test)
+
+    mae = mean_absolute_error(y_test, y_pred)
+    rmse_val = rmse(y_test, y_pred)
+    r2 = r2_score(y_test, y_pred)
+
+    print("\n--- Optimized Model Performance ---")
+    print(f"MAE:  {mae:.4f}")
+    print(f"RMSE: {rmse_val:.4f}")
+    print(f"R2:   {r2:.4f}")
+
+    # Save best model
+    joblib.dump(best_rf, 'models/best_random_forest.joblib')
+    print("Saved best_random_forest.joblib")
+
+    with open(REPORT_PATH, 'w', encoding='utf-8') as f:
+        json.dump({'run_at': time.strftime('%Y-%m-%d %H:%M:%S'), 'selected': args.search,
+                   'split': split.name, 'searches': report}, f, indent=2, default=str)
+    print(f"Saved {REPORT_PATH}")
+
+    # Feature Importance
+    importances = best_rf.feature_importances_
+    feature_names = split.columns
+    feature_df = pd.DataFrame({'Feature': feature_names, 'Importance': importances})
+    feature_df = feature_df.sort_values(by='Importance', ascending=False)
+
+    print("\nTop 5 Features:")
+    print(feature_df.head())
+
+    plt.figure(figsize=(10, 8))
+    # Plot top 15
+    import seaborn as sns
+    sns.barplot(x='Importance', y='Feature', data=feature_df.head(15))
+    plt.title('Feature Importance (Optimized RF)')
+    plt.tight_layout()
+    plt.savefig('images/feature_importance.png')
+    print("Saved feature_importance.png")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,97 +1,192 @@
+import argparse
+import json
+import multiprocessing
+import os
+import platform
+import sys
+import time
+
 import pandas as pd
 import numpy as np
+import matplotlib
+matplotlib.use('Agg')
 import matplotlib.pyplot as plt
 import seaborn as sns
-from sklearn.model_selection import train_test_split, cross_val_score
+import sklearn
+from sklearn.model_selection import cross_val_score
 from sklearn.tree import DecisionTreeRegressor
 from sklearn.ensemble import RandomForestRegressor, GradientBoostingRegressor
 from sklearn.metrics import mean_absolute_error, mean_squared_error, r2_score
 import joblib
-import os
+from feature_store import Split, load_split, SPLITS
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from common.resources import peak_rss_mb
+
+LEDGER_PATH = 'models/training_ledger.jsonl'
+
+
+def build_models():
+    return {
+        "Decision Tree": DecisionTreeRegressor(random_state=42),
+        "Random Forest": RandomForestRegressor(n_estimators=100, random_state=42),
+        "Gradient Boosting": GradientBoostingRegressor(n_estimators=100, random_state=42)
+    }
+
+
+def hardware_info():
+    return {
+        'platform': platform.platform(),
+        'processor': platform.processor() or platform.machine(),
+        'cpu_count': os.cpu_count(),
+        'python': platform.python_version(),
+        'sklearn': sklearn.__version__,
+    }
 
-# Create models directory
-if not os.path.exists('models'):
-    os.makedirs('models')
-
-# Load data
-print("Loading data...")
-try:
-    df = pd.read_csv('processed_bike_data.csv')
-except FileNotFoundError:
-    print("Error: processed_bike_data.csv not found.")
-    exit()
-
-# Define Target and Features
-# Target is 'cnt'
-# We must DROP 'casual' and 'registered' because cnt = casual + registered (Data Leakage)
-target = 'cnt'
-drop_cols = ['casual', 'registered', 'cnt'] 
-# Note: 'cnt' is in drop_cols just to define X, but we keep it for y.
-
-X = df.drop(columns=drop_cols, errors='ignore')
-y = df[target]
-
-print(f"Features shape: {X.shape}")
-print(f"Target shape: {y.shape}")
-
-# Split data
-X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
-print(f"Train set: {X_train.shape}")
-print(f"Test set: {X_test.shape}")
-
-# Initialize Models
-models = {
-    "Decision Tree": DecisionTreeRegressor(random_state=42),
-    "Random Forest": RandomForestRegressor(n_estimators=100, random_state=42),
-    "Gradient Boosting": GradientBoostingRegressor(n_estimators=100, random_state=42)
-}
-
-results = {}
-
-print("\n--- Model Training & Evaluation ---")
-for name, model in models.items():
-    print(f"\nTraining {name}...")
+
+def train_and_evaluate(name, model, data_dir):
+    """Fit one model on the shared arrays, save it and return its ledger record.
+
+    The arrays are memory-mapped from the feature store, so worker processes
+    read the same pages instead of receiving a pickled copy of the matrix.
+    """
+    split = Split(data_dir)
+    X_train, y_train = split.X_train, split.y_train
+    X_test, y_test = split.X_test, split.y_test
+
+    start = time.perf_counter()
     model.fit(X_train, y_train)
-    
+    fit_seconds = time.perf_counter() - start
+
     # Predictions
+    start = time.perf_counter()
     y_pred = model.predict(X_test)
-    
+    predict_seconds = time.perf_counter() - start
+
     # Evaluation
     mae = mean_absolute_error(y_test, y_pred)
     mse = mean_squared_error(y_test, y_pred)
     rmse = np.sqrt(mse)
     r2 = r2_score(y_test, y_pred)
-    
-    results[name] = {"MAE": mae, "RMSE": rmse, "R2": r2}
-    
-    print(f"{name} Results:")
-    print(f"  MAE:  {mae:.4f}")
-    print(f"  RMSE: {rmse:.4f}")
-    print(f"  R2:   {r2:.4f}")
-    
+
     # Save model
     filename = f"models/{name.replace(' ', '_').lower()}.joblib"
     joblib.dump(model, filename)
-    print(f"  Saved model to {filename}")
-
-# Comparison Visualization
-print("\n--- Generating Comparison Plot ---")
-results_df = pd.DataFrame(results).T
-print(results_df)
-
-plt.figure(figsize=(10, 6))
-results_df['R2'].plot(kind='barh', color='skyblue')
-plt.title('Model Comparison - R2 Score')
-plt.xlabel('R2 Score')
-plt.xlim(0, 1)
-plt.tight_layout()
-plt.savefig('images/model_comparison_r2.png')
-
-plt.figure(figsize=(10, 6))
-results_df['RMSE'].plot(kind='barh', color='salmon')
-plt.title('Model Comparison - RMSE (Lower is Better)')
-plt.xlabel('RMSE')
-plt.tight_layout()
-plt.savefig('images/model_comparison_rmse.png')
-
-print("\nModel building complete. Results saved.")
+
+    return {
+        'model': name,
+        'artifact': filename,
+        'fit_seconds': round(fit_seconds, 4),
+        'predict_ms_per_1k_rows': round(predict_seconds / len(X_test) * 1000 * 1000, 4),
+        'peak_rss_mb': peak_rss_mb(),
+        'artifact_bytes': os.path.getsize(filename),
+        'MAE': float(mae),
+        'RMSE': float(rmse),
+        'R2': float(r2),
+    }
+
+
+def _train_worker(job):
+    return train_and_evaluate(*job)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Train and compare regression models.")
+    parser.add_argument('--parallel', action='store_true',
+                        help="Fit the models concurrently in a process pool.")
+    parser.add_argument('--workers', type=int, default=None,
+                        help="Pool size (default: one process per model).")
+    parser.add_argument('--split', choices=SPLITS, default='random',
+                        help="Named train/test split from the feature store.")
+    args = parser.parse_args()
+
+    # Create models directory
+    if not os.path.exists('models'):
+        os.makedirs('models')
+
+    # Load data
+    # Target is 'cnt'; 'casual' and 'registered' are excluded from the
+    # features because cnt = casual + registered (Data Leakage).
+    # The split is float32 (trees work in float32 internally).
+    print("Loading data...")
+    try:
+        split = load_split(args.split)
+    except FileNotFoundError:
+        print("Error: processed_bike_data.csv not found.")
+        exit()
+
+    print(f"Split: {split.name}")
+    print(f"Train set: {split.X_train.shape}")
+    print(f"Test set: {split.X_test.shape}")
+    data_dir = split.path
+
+    # Initialize Models
+    models = build_models()
+    jobs = [(name, model, data_dir) for name, model in models.items()]
+
+    print("\n--- Model Training & Evaluation ---")
+    run_start = time.perf_counter()
+    workers = (args.workers or len(jobs)) if args.parallel else 1
+    if args.parallel:
+        print(f"Training {len(jobs)} models in parallel ({workers} processes)...")
+    # Every model is fitted in a fresh process (maxtasksperchild=1, chunksize=1),
+    # also in serial mode, so each peak_rss_mb belongs to that model alone
+    records = []
+    with multiprocessing.Pool(workers, maxtasksperchild=1) as pool:
+        for record in pool.imap(_train_worker, jobs, chunksize=1):
+            print(f"Trained {record['model']}")
+            records.append(record)
+    wall_seconds = time.perf_counter() - run_start
+
+    results = {}
+    for record in records:
+        name = record['model']
+        results[name] = {"MAE": record['MAE'], "RMSE": record['RMSE'], "R2": record['R2']}
+        print(f"\n{name} Results:")
+        print(f"  MAE:  {record['MAE']:.4f}")
+        print(f"  RMSE: {record['RMSE']:.4f}")
+        print(f"  R2:   {record['R2']:.4f}")
+        print(f"  Fit time: {record['fit_seconds']:.2f}s, predict: {record['predict_ms_per_1k_rows']:.2f} ms / 1k rows")
+        print(f"  Saved model to {record['artifact']}")
+    print(f"\nTotal training wall time: {wall_seconds:.2f}s")
+
+    # Ledger: one JSON line per model so runs can be compared over time
+    run_info = {
+        'run_at': time.strftime('%Y-%m-%d %H:%M:%S'),
+        'mode': 'parallel' if args.parallel else 'serial',
+        'split': split.name,
+        'run_wall_seconds': round(wall_seconds, 4),
+        'n_train': len(split.X_train),
+        'n_test': len(split.X_test),
+        'hardware': hardware_info(),
+    }
+    with open(LEDGER_PATH, 'a', encoding='utf-8') as f:
+        for record in records:
+            f.write(json.dumps({**run_info, **record}) + "\n")
+    print(f"Appended {len(records)} records to {LEDGER_PATH}")
+
+    # Comparison Visualization
+    print("\n--- Generating Comparison Plot ---")
+    results_df = pd.DataFrame(results).T
+    print(results_df)
+
+    plt.figure(figsize=(10, 6))
+    results_df['R2'].plot(kind='barh', color='skyblue')
+    plt.title('Model Comparison - R2 Score')
+    plt.xlabel('R2 Score')
+    plt.xlim(0, 1)
+    plt.tight_layout()
+    plt.savefig('images/model_comparison_r2.png')
+
+    plt.figure(figsize=(10, 6))
+    results_df['RMSE'].plot(kind='barh', color='salmon')
+    plt.title('Model Comparison - RMSE (Lower is Better)')
+    plt.xlabel('RMSE')
+    plt.tight_layout()
+    plt.savefig('images/model_comparison_rmse.png')
+
+    print("\nModel building complete. Results saved.")
+
+
+if __name__ == "__main__":
+    main()
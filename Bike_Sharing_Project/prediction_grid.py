@@ -0,0 +1,180 @@
+"""
+Precomputed Prediction Grid
+Scores the model once, at deploy time, over every combination of the app's
+discrete inputs and a quantized grid of the four weather sliders, and stores
+the result as a memory-mapped uint16 table (prediction x 10):
+
+    prediction_grid/
+        meta.json    axes (name + values, in table order), scale
+        grid.npy     uint16, one dimension per axis
+
+A lookup is a single index into the table, so its cost does not depend on the
+forest size. Weather values between two levels are interpolated multilinearly
+from the 16 surrounding grid points (interpolate()); that is an approximation
+of the forest, so callers should label it. Discrete inputs that are not on the
+grid return None and the caller falls back to the live model.
+
+Usage:
+    python prediction_grid.py [--levels 3] [--workers 8]
+"""
+
+import argparse
+import itertools
+import json
+import multiprocessing
+import os
+import time
+
+import numpy as np
+
+SCALE = 10
+WEATHER_COLS = ['temp', 'atemp', 'hum', 'windspeed']
+
+# Discrete inputs of Bike_App/streamlit_app.py
+DISCRETE_AXES = [
+    ('yr', [0, 1]),
+    ('season', ['springer', 'summer', 'fall', 'winter']),
+    ('weathersit', ['Clear', 'Mist', 'Light Snow', 'Heavy Rain']),
+    ('holiday', [0, 1]),
+    ('workingday', [0, 1]),
+    ('mnth', list(range(1, 13))),
+    ('weekday', list(range(7))),
+    ('hr', list(range(24))),
+]
+
+
+class PredictionGrid:
+    """Read-only lookup table over the input lattice"""
+
+    def __init__(self, path):
+        with open(os.path.join(path, 'meta.json'), 'r', encoding='utf-8') as f:
+            self.meta = json.load(f)
+        self.table = np.load(os.path.join(path, 'grid.npy'), mmap_mode='r')
+        self.scale = self.meta['scale']
+        # value -> position, per axis
+        self._index = [(name, {self._key(v): i for i, v in enumerate(values)})
+                       for name, values in self.meta['axes']]
+        # Sorted levels of the interpolated (weather) axes
+        self._levels = {name: np.asarray(values, dtype=np.float64)
+                        for name, values in self.meta['axes'] if name in WEATHER_COLS}
+
+    @staticmethod
+    def _key(value):
+        if isinstance(value, str):
+            return value
+        return round(float(value), 6)
+
+    def lookup(self, raw):
+        """Prediction for one raw input dict, or None if it is off the grid"""
+        position = []
+        for name, index in self._index:
+            i = index.get(self._key(raw[name]))
+            if i is None:
+                return None
+            position.append(i)
+        return float(self.table[tuple(position)]) / self.scale
+
+    def interpolate(self, raw):
+        """Multilinear estimate over the weather axes (16 corner lookups), or
+        None if a discrete input is off the grid or a weather value is outside
+        the grid range"""
+        corners = []
+        for name, index in self._index:
+            levels = self._levels.get(name)
+            if levels is None or len(levels) < 2:
+                i = index.get(self._key(raw[name]))
+                if i is None:
+                    return None
+                corners.append([(i, 1.0)])
+                continue
+            value = float(raw[name])
+            if not levels[0] <= value <= levels[-1]:
+                return None
+            i = min(int(np.searchsorted(levels, value, side='right')) - 1, len(levels) - 2)
+            t = (value - levels[i]) / (levels[i + 1] - levels[i])
+            corners.append([(i, 1.0 - t), (i + 1, t)])
+
+        total = 0.0
+        for corner in itertools.product(*corners):
+            weight = float(np.prod([w for _, w in corner]))
+            if weight:
+                total += weight * float(self.table[tuple(i for i, _ in corner)])
+        return total / self.scale
+
+
+def grid_axes(levels):
+    weather = [round(float(v), 6) for v in np.linspace(0.0, 1.0, levels)]
+    return DISCRETE_AXES + [(col, weather) for col in WEATHER_COLS]
+
+
+# Per-worker state for the build
+_model = None
+_transformer = None
+_axes = None
+
+
+def _init_worker(model_path, transformer_path, axes):
+    global _model, _transformer, _axes
+    from batch_score import load_model
+    from bike_features import BikeFeatureTransformer
+    _model = load_model(model_path)
+    _transformer = BikeFeatureTransformer.load(transformer_path)
+    _axes = axes
+
+
+def _score_range(bounds):
+    """Predictions for flat table positions [start, stop)"""
+    start, stop = bounds
+    shape = [len(values) for _, values in _axes]
+    positions = np.unravel_index(np.arange(start, stop), shape)
+    raw = {name: np.asarray(values)[pos] for (name, values), pos in zip(_axes, positions)}
+    predictions = _model.predict(_transformer.transform(raw))
+    return start, np.clip(np.round(predictions * SCALE), 0, np.iinfo(np.uint16).max).astype(np.uint16)
+
+
+def build_grid(model_path, transformer_path, output, levels=3, workers=None, block=200_000):
+    # Build-time only; the app imports this module without bike_store
+    from bike_store import atomic_directory
+
+    axes = grid_axes(levels)
+    shape = tuple(len(values) for _, values in axes)
+    total = int(np.prod(shape))
+    print(f"Building {' x '.join(map(str, shape))} = {total:,} predictions "
+          f"({total * 2 / 1e6:.1f} MB)...")
+
+    with atomic_directory(output) as tmp:
+        table = np.lib.format.open_memmap(os.path.join(tmp, 'grid.npy'), mode='w+',
+                                          dtype=np.uint16, shape=shape)
+        flat = table.reshape(-1)
+        ranges = [(s, min(s + block, total)) for s in range(0, total, block)]
+        start_time = time.perf_counter()
+        with multiprocessing.Pool(workers, initializer=_init_worker,
+                                  initargs=(model_path, transformer_path, axes)) as pool:
+            for done, (start, values) in enumerate(pool.imap_unordered(_score_range, ranges), 1):
+                flat[start:start + len(values)] = values
+                if done % 20 == 0 or done == len(ranges):
+                    print(f"  {done}/{len(ranges)} blocks ({time.perf_counter() - start_time:.0f}s)")
+        table.flush()
+        del flat, table
+
+        with open(os.path.join(tmp, 'meta.json'), 'w', encoding='utf-8') as f:
+            json.dump({'axes': axes, 'scale': SCALE, 'model': os.path.basename(model_path)}, f, indent=2)
+    print(f"Saved {output} in {time.perf_counter() - start_time:.0f}s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Precompute the app's prediction grid.")
+    # Blocks of 200k rows: sklearn is faster here than the compiled forest
+    parser.add_argument('--model', default='models/best_random_forest.joblib')
+    parser.add_argument('--transformer', default='models/feature_transformer.json')
+    parser.add_argument('--output', default='models/prediction_grid')
+    parser.add_argument('--levels', type=int, default=3,
+                        help="Levels per weather slider between 0 and 1 (table grows as levels^4).")
+    parser.add_argument('--workers', type=int, default=os.cpu_count())
+    args = parser.parse_args()
+
+    build_grid(args.model, args.transformer, args.output, args.levels, args.workers)
+
+
+if __name__ == "__main__":
+    main()
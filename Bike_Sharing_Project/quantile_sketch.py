@@ -0,0 +1,80 @@
+"""
+Mergeable Quantile Sketch
+A small KLL sketch (Karnin, Lang, Liberty 2016) for estimating medians and
+other quantiles of a column that is streamed in chunks. Memory is bounded by
+roughly 3k values regardless of how many values are added, and sketches built
+on separate chunks or files can be merged.
+"""
+
+import math
+import random
+
+import numpy as np
+
+
+class KLLSketch:
+    """Approximate quantiles over a stream of numbers"""
+
+    def __init__(self, k=200, seed=None):
+        self.k = k
+        self.n = 0
+        # Level h holds items that each stand for 2**h original values
+        self.levels = [np.empty(0)]
+        self._rng = random.Random(seed)
+
+    def _capacity(self, level):
+        depth = len(self.levels) - level - 1
+        return int(math.ceil(self.k * (2.0 / 3.0) ** depth)) + 1
+
+    def _max_size(self):
+        return sum(self._capacity(h) for h in range(len(self.levels)))
+
+    def _size(self):
+        return sum(len(items) for items in self.levels)
+
+    def _compress(self):
+        while self._size() >= self._max_size():
+            for h, items in enumerate(self.levels):
+                if len(items) >= self._capacity(h):
+                    if h + 1 == len(self.levels):
+                        self.levels.append(np.empty(0))
+                    items = np.sort(items)
+                    # Keep every other item; the random offset keeps it unbiased
+                    offset = self._rng.randint(0, 1)
+                    self.levels[h + 1] = np.concatenate([self.levels[h + 1], items[offset::2]])
+                    self.levels[h] = np.empty(0)
+                    break
+
+    def update(self, values):
+        """Add an array of values (NaNs are ignored)"""
+        values = np.asarray(values, dtype=np.float64).ravel()
+        values = values[~np.isnan(values)]
+        if len(values) == 0:
+            return
+        self.n += len(values)
+        self.levels[0] = np.concatenate([self.levels[0], values])
+        self._compress()
+
+    def merge(self, other):
+        """Fold another sketch into this one"""
+        while len(self.levels) < len(other.levels):
+            self.levels.append(np.empty(0))
+        for h, items in enumerate(other.levels):
+            self.levels[h] = np.concatenate([self.levels[h], items])
+        self.n += other.n
+        self._compress()
+        return self
+
+    def quantile(self, q):
+        """Estimated q-quantile (0 <= q <= 1); NaN if the sketch is empty"""
+        if self.n == 0:
+            return float('nan')
+        items = np.concatenate(self.levels)
+        weights = np.concatenate([np.full(len(lv), 2.0 ** h) for h, lv in enumerate(self.levels)])
+        order = np.argsort(items, kind='stable')
+        cum = np.cumsum(weights[order])
+        idx = np.searchsorted(cum, q * cum[-1], side='left')
+        return float(items[order][min(idx, len(items) - 1)])
+
+    def median(self):
+        return self.quantile(0.5)
@@ -0,0 +1,258 @@
+"""
+Incremental Pipeline Runner
+Runs the Bike Sharing scripts as a chain of stages:
+
+    Dataset.csv -> cleaned_bike_data.csv -> processed_bike_data.csv
+                -> models/*.joblib -> models/*.forest -> images/
+
+Each stage is fingerprinted from its script source, helper modules,
+input file contents and parameters. A stage whose fingerprint matches the
+last successful run and whose outputs still exist is skipped.
+
+Usage:
+    python run_pipeline.py                 # run whatever is stale
+    python run_pipeline.py --force models  # force one or more stages
+    python run_pipeline.py --dry-run       # only report what would run
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import subprocess
+import sys
+import time
+
+PROJECT_DIR = os.path.dirname(os.path.abspath(__file__))
+STATE_DIR = os.path.join(PROJECT_DIR, '.pipeline')
+STATE_FILE = os.path.join(STATE_DIR, 'state.json')
+REPORT_FILE = os.path.join(STATE_DIR, 'last_run.json')
+
+
+class Stage:
+    """One script of the pipeline with its declared inputs and outputs"""
+
+    def __init__(self, name, script, inputs, outputs, deps=(), args=()):
+        self.name = name
+        self.script = script
+        self.inputs = list(inputs)
+        self.outputs = list(outputs)
+        # Helper modules imported by the script (part of the code fingerprint)
+        self.deps = list(deps)
+        # Command-line parameters passed to the script
+        self.args = list(args)
+
+
+STAGES = [
+    Stage('eda', 'eda_analysis_v2.py',
+          inputs=['Dataset.csv'],
+          outputs=['cleaned_dataset.csv',
+                   'images/outliers_boxplot_cleaned.png',
+                   'images/correlation_matrix.png']),
+    Stage('clean', 'clean_and_analyze.py',
+          deps=['bike_store.py', 'quantile_sketch.py'],
+          inputs=['Dataset.csv'],
+          outputs=['cleaned_bike_data.csv',
+                   'cleaned_bike_data.cols/schema.json',
+                   'images/correlation_matrix_final.png',
+                   'images/time_series_trend.png']),
+    Stage('features', 'feature_engineering_v2.py',
+          deps=['bike_store.py', 'bike_features.py', 'feature_store.py'],
+          inputs=['cleaned_bike_data.csv'],
+          outputs=['processed_bike_data.csv',
+                   'processed_bike_data.cols/schema.json',
+                   'models/feature_transformer.json',
+                   'feature_store/random/meta.json',
+                   'feature_store/time/meta.json',
+                   'images/correlation_matrix_processed.png']),
+    Stage('models', 'model_building.py',
+          deps=['bike_store.py', 'feature_store.py'],
+          args=['--parallel'],
+          inputs=['processed_bike_data.csv'],
+          outputs=['models/decision_tree.joblib',
+                   'models/random_forest.joblib',
+                   'models/gradient_boosting.joblib',
+                   'images/model_comparison_r2.png',
+                   'images/model_comparison_rmse.png']),
+    Stage('tuning', 'hyperparameter_tuning.py',
+          deps=['bike_store.py', 'feature_store.py'],
+          args=['--search', 'halving'],
+          inputs=['processed_bike_data.csv'],
+          outputs=['models/best_random_forest.joblib',
+                   'images/feature_importance.png']),
+    Stage('compile', 'forest_compiler.py',
+          deps=['bike_store.py', 'feature_store.py'],
+          inputs=['models/best_random_forest.joblib'],
+          outputs=['models/best_random_forest.forest/meta.json']),
+    Stage('grid', 'prediction_grid.py',
+          deps=['batch_score.py', 'bike_features.py', 'bike_store.py'],
+          inputs=['models/best_random_forest.joblib',
+                  'models/feature_transformer.json'],
+          outputs=['models/prediction_grid/meta.json']),
+    Stage('images', 'generate_ppt_images.py',
+          deps=['bike_store.py', 'feature_store.py'],
+          inputs=['cleaned_bike_data.csv',
+                  'processed_bike_data.csv',
+                  'models/best_random_forest.joblib'],
+          outputs=['images/dist_cnt.png',
+                   'images/hourly_trend.png',
+                   'images/seasonal_demand.png',
+                   'images/weather_impact.png',
+                   'images/temp_vs_count.png',
+                   'images/workingday_holiday.png',
+                   'images/actual_vs_predicted.png',
+                   'images/top_drivers.png']),
+    Stage('summary', 'summarize_results.py',
+          deps=['bike_store.py', 'feature_store.py'],
+          inputs=['processed_bike_data.csv',
+                  'models/best_random_forest.joblib'],
+          outputs=[]),
+]
+
+
+def load_state():
+    """Load fingerprints and cached file hashes from the previous run"""
+    if os.path.exists(STATE_FILE):
+        with open(STATE_FILE, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    return {'stages': {}, 'files': {}}
+
+
+def save_state(state):
+    """Persist fingerprints and file hashes"""
+    os.makedirs(STATE_DIR, exist_ok=True)
+    tmp_path = STATE_FILE + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(state, f, indent=2, sort_keys=True)
+    os.replace(tmp_path, STATE_FILE)
+
+
+def file_digest(rel_path, file_cache):
+    """SHA-256 of a file, reusing the cached digest while size and mtime match"""
+    path = os.path.join(PROJECT_DIR, rel_path)
+    if not os.path.exists(path):
+        return None
+    stat = os.stat(path)
+    cached = file_cache.get(rel_path)
+    if cached and cached['size'] == stat.st_size and cached['mtime_ns'] == stat.st_mtime_ns:
+        return cached['sha256']
+
+    h = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            h.update(block)
+    digest = h.hexdigest()
+    file_cache[rel_path] = {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns, 'sha256': digest}
+    return digest
+
+
+def stage_fingerprint(stage, file_cache):
+    """Combine code, inputs and parameters into one fingerprint"""
+    h = hashlib.sha256()
+    for rel_path in [stage.script] + stage.deps + stage.inputs:
+        digest = file_digest(rel_path, file_cache)
+        if digest is None:
+            # A missing input or script can never be a cache hit
+            return None
+        h.update(f"{rel_path}:{digest}\n".encode('utf-8'))
+    h.update(json.dumps(stage.args).encode('utf-8'))
+    return h.hexdigest()
+
+
+def outputs_exist(stage):
+    return all(os.path.exists(os.path.join(PROJECT_DIR, p)) for p in stage.outputs)
+
+
+def run_stage(stage):
+    """Execute the stage script from the project directory"""
+    cmd = [sys.executable, stage.script] + stage.args
+    print(f"\n>>> [{stage.name}] {' '.join(cmd[1:])}")
+    return subprocess.run(cmd, cwd=PROJECT_DIR).returncode
+
+
+def print_report(report):
+    print("\n" + "=" * 50)
+    print("Pipeline Report")
+    print("=" * 50)
+    print(f"{'Stage':<10} {'Status':<8} {'Seconds':>9}")
+    for row in report['stages']:
+        print(f"{row['stage']:<10} {row['status']:<8} {row['seconds']:>9.2f}")
+    hits = sum(1 for row in report['stages'] if row['status'] == 'cached')
+    print(f"\nCache hits: {hits}/{len(report['stages'])}")
+    print(f"Total time: {report['total_seconds']:.2f}s")
+
+
+def main():
+    stage_names = [s.name for s in STAGES]
+    parser = argparse.ArgumentParser(description="Run the bike sharing pipeline incrementally.")
+    parser.add_argument('--force', nargs='*', choices=stage_names, default=None,
+                        help="Re-run the given stages (all stages if none given).")
+    parser.add_argument('--only', nargs='+', choices=stage_names,
+                        help="Restrict the run to these stages.")
+    parser.add_argument('--dry-run', action='store_true',
+                        help="Report stale stages without running them.")
+    args = parser.parse_args()
+
+    if args.force is None:
+        forced = set()
+    else:
+        forced = set(args.force) if args.force else set(stage_names)
+
+    state = load_state()
+    file_cache = state.setdefault('files', {})
+    fingerprints = state.setdefault('stages', {})
+
+    report = {'started': time.strftime('%Y-%m-%d %H:%M:%S'), 'stages': []}
+    run_start = time.perf_counter()
+    failed = False
+
+    for stage in STAGES:
+        if args.only and stage.name not in args.only:
+            continue
+
+        start = time.perf_counter()
+        fingerprint = stage_fingerprint(stage, file_cache)
+        current = (
+            stage.name not in forced
+            and fingerprint is not None
+            and fingerprints.get(stage.name) == fingerprint
+            and outputs_exist(stage)
+        )
+
+        if current:
+            status = 'cached'
+        elif args.dry_run:
+            status = 'stale'
+        else:
+            returncode = run_stage(stage)
+            if returncode == 0:
+                status = 'ran'
+                # Outputs were rewritten, so recompute anything depending on them
+                fingerprints[stage.name] = stage_fingerprint(stage, file_cache)
+            else:
+                status = 'failed'
+                fingerprints.pop(stage.name, None)
+
+        report['stages'].append({
+            'stage': stage.name,
+            'status': status,
+            'seconds': round(time.perf_counter() - start, 3),
+        })
+        if status == 'failed':
+            failed = True
+            print(f"Stage '{stage.name}' failed; stopping.")
+            break
+
+    report['total_seconds'] = round(time.perf_counter() - run_start, 3)
+
+    if not args.dry_run:
+        save_state(state)
+        with open(REPORT_FILE, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+
+    print_report(report)
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
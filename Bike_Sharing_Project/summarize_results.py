@@ -1,19 +1,15 @@
 import joblib
-import pandas as pd
-from sklearn.model_selection import train_test_split
 from sklearn.metrics import mean_absolute_error, mean_squared_error, r2_score
 import numpy as np
+from feature_store import load_split
 
 # Load data and model
-df = pd.read_csv('processed_bike_data.csv')
+split = load_split('random')
 model = joblib.load('models/best_random_forest.joblib')
 
-target = 'cnt'
-X = df.drop(columns=['casual', 'registered', 'cnt'], errors='ignore')
-y = df[target]
-X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
+X_test, y_test = split.X_test, split.y_test
 
-y_pred = model.predict(X_test)
+y_pred = model.predict(split.model_input(model, X_test))
 mae = mean_absolute_error(y_test, y_pred)
 rmse = np.sqrt(mean_squared_error(y_test, y_pred))
 r2 = r2_score(y_test, y_pred)
@@ -0,0 +1,71 @@
+"""
+End-to-end check of batch_score.py: scoring cleaned_bike_data.csv through the
+saved transformer and merging the parts must reproduce the model's RMSE on the
+random test split of processed_bike_data.csv.
+
+Usage:
+    python -m pytest test_batch_score.py
+"""
+
+import os
+import subprocess
+import sys
+
+import joblib
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.ensemble import RandomForestRegressor
+from sklearn.model_selection import train_test_split
+
+PROJECT_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+def run_batch_score(*args):
+    return subprocess.run([sys.executable, os.path.join(PROJECT_DIR, 'batch_score.py'), *map(str, args)],
+                          cwd=PROJECT_DIR, capture_output=True, text=True)
+
+
+@pytest.fixture(scope='module')
+def artifacts(transformer, processed, tmp_path_factory):
+    """A small forest fitted on the random split, saved with the transformer"""
+    path = tmp_path_factory.mktemp('models')
+    X = processed[transformer.columns]
+    y = processed['cnt'].to_numpy()
+    train_idx, test_idx = train_test_split(np.arange(len(processed)), test_size=0.2, random_state=42)
+    model = RandomForestRegressor(n_estimators=20, max_depth=12, random_state=42)
+    model.fit(X.iloc[train_idx], y[train_idx])
+    joblib.dump(model, path / 'model.joblib')
+    transformer.save(path / 'feature_transformer.json')
+    rmse = float(np.sqrt(np.mean((model.predict(X.iloc[test_idx]) - y[test_idx]) ** 2)))
+    return path, test_idx, rmse
+
+
+def test_merged_predictions_reproduce_test_rmse(artifacts, tmp_path):
+    path, test_idx, rmse = artifacts
+    merged = tmp_path / 'forecasts.csv'
+    out = run_batch_score(os.path.join(PROJECT_DIR, 'cleaned_bike_data.csv'), tmp_path / 'parts',
+                          '--model', path / 'model.joblib', '--transformer', path / 'feature_transformer.json',
+                          '--chunksize', 5000, '--workers', 2, '--merge', merged)
+    assert out.returncode == 0, out.stderr
+
+    scored = pd.read_csv(merged)
+    residuals = scored['predicted_cnt'].to_numpy()[test_idx] - scored['cnt'].to_numpy()[test_idx]
+    # The committed processed CSV holds float64 text, so a handful of encoded
+    # values sit one float32 step away and can cross a split threshold
+    assert np.sqrt(np.mean(residuals ** 2)) == pytest.approx(rmse, rel=1e-3)
+
+
+def test_bad_chunk_names_chunk_and_column(artifacts, cleaned, tmp_path):
+    path, _, _ = artifacts
+    broken = cleaned.copy()
+    broken['temp'] = broken['temp'].astype(object)
+    broken.loc[7001, 'temp'] = '?'
+    broken.to_csv(tmp_path / 'broken.csv', index=False)
+    out = run_batch_score(tmp_path / 'broken.csv', tmp_path / 'parts',
+                          '--model', path / 'model.joblib', '--transformer', path / 'feature_transformer.json',
+                          '--chunksize', 5000, '--workers', 1)
+    assert out.returncode != 0
+    assert "chunk 1 (rows 5,001-10,000)" in out.stderr
+    assert "column 'temp'" in out.stderr
+    assert 'Traceback' not in out.stderr
@@ -0,0 +1,49 @@
+"""
+Checks that BikeFeatureTransformer replays feature_engineering_v2.py:
+raw cleaned rows must encode to the processed rows the models were trained on.
+
+Usage:
+    python -m pytest test_bike_features.py
+"""
+
+import numpy as np
+import pytest
+
+from bike_features import BikeFeatureTransformer
+
+TARGET_COLS = ['casual', 'registered', 'cnt']
+
+
+def test_cleaned_rows_encode_to_processed_rows(transformer, cleaned, processed):
+    assert transformer.columns == [c for c in processed.columns if c not in TARGET_COLS]
+    X = transformer.transform(cleaned)
+    expected = processed[transformer.columns].to_numpy(dtype=np.float32)
+    np.testing.assert_allclose(X, expected, atol=1e-6)
+
+
+def test_round_trip_keeps_repairs(transformer, cleaned, tmp_path):
+    path = tmp_path / 'feature_transformer.json'
+    transformer.save(path)
+    loaded = BikeFeatureTransformer.load(path)
+    np.testing.assert_array_equal(loaded.transform(cleaned), transformer.transform(cleaned))
+
+
+def test_year_codes_and_missing_values(transformer):
+    row = {'hr': 8, 'mnth': 6, 'weekday': 2, 'yr': 2012, 'holiday': '?', 'workingday': 'Working Day',
+           'season': 'summer', 'weathersit': '?', 'temp': 0.5, 'atemp': 0.5, 'hum': 0.5, 'windspeed': 0.1}
+    X = transformer.transform(row)
+    col = transformer.columns.index
+    assert X[0, col('yr')] == 1
+    assert X[0, col('holiday')] == 0
+    np.testing.assert_array_equal(X, transformer.transform(dict(row, yr=1, holiday='No', weathersit='Clear')))
+    np.testing.assert_array_equal(transformer.transform(dict(row, yr='?'))[0, col('yr')],
+                                  transformer.modes['yr'])
+
+
+def test_bad_values_name_the_column(transformer):
+    row = {'hr': 8, 'mnth': 6, 'weekday': 2, 'yr': 2013, 'holiday': 'No', 'workingday': 'Working Day',
+           'season': 'summer', 'weathersit': 'Clear', 'temp': 0.5, 'atemp': 0.5, 'hum': 0.5, 'windspeed': 0.1}
+    with pytest.raises(ValueError, match="'yr'"):
+        transformer.transform(row)
+    with pytest.raises(ValueError, match="'temp'"):
+        transformer.transform(dict(row, yr=1, temp='?'))
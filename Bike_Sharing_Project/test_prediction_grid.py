@@ -0,0 +1,54 @@
+"""
+PredictionGrid lookups and weather interpolation on a small synthetic table.
+
+Usage:
+    python -m pytest test_prediction_grid.py
+"""
+
+import json
+
+import numpy as np
+import pytest
+
+from prediction_grid import WEATHER_COLS, PredictionGrid
+
+AXES = [('yr', [0, 1]), ('season', ['springer', 'summer'])] + \
+       [(col, [0.0, 0.5, 1.0]) for col in WEATHER_COLS]
+WEIGHTS = [100, 200, 300, 400]
+
+
+def linear(raw):
+    """A table value that is linear in every weather input"""
+    return 10 * raw['yr'] + (raw['season'] == 'summer') * 5 + sum(
+        w * raw[col] for w, col in zip(WEIGHTS, WEATHER_COLS))
+
+
+@pytest.fixture
+def grid(tmp_path):
+    shape = [len(values) for _, values in AXES]
+    table = np.empty(shape, dtype=np.uint16)
+    for position in np.ndindex(*shape):
+        raw = {name: values[i] for (name, values), i in zip(AXES, position)}
+        table[position] = round(linear(raw) * 10)
+    np.save(tmp_path / 'grid.npy', table)
+    with open(tmp_path / 'meta.json', 'w', encoding='utf-8') as f:
+        json.dump({'axes': AXES, 'scale': 10}, f)
+    return PredictionGrid(str(tmp_path))
+
+
+def test_on_grid_lookup_and_interpolation_agree(grid):
+    raw = {'yr': 1, 'season': 'summer', 'temp': 0.5, 'atemp': 1.0, 'hum': 0.0, 'windspeed': 0.5}
+    assert grid.lookup(raw) == pytest.approx(linear(raw))
+    assert grid.interpolate(raw) == pytest.approx(linear(raw))
+
+
+def test_between_levels_is_interpolated(grid):
+    raw = {'yr': 0, 'season': 'springer', 'temp': 0.37, 'atemp': 0.81, 'hum': 0.05, 'windspeed': 0.1}
+    assert grid.lookup(raw) is None
+    assert grid.interpolate(raw) == pytest.approx(linear(raw), abs=0.1)
+
+
+def test_off_grid_inputs_fall_back(grid):
+    raw = {'yr': 0, 'season': 'fall', 'temp': 0.5, 'atemp': 0.5, 'hum': 0.5, 'windspeed': 0.5}
+    assert grid.interpolate(raw) is None
+    assert grid.interpolate(dict(raw, season='summer', temp=1.2)) is None
@@ -0,0 +1,204 @@
+"""
+Clustering Explorer for the East-West Airlines Members
+Runs the notebook's parameter exploration in one pass over a single scaled
+float32 array:
+
+- K sweep (K=1..10, elbow WCSS): the fits run in parallel worker processes
+  that share the array through a joblib memmap; --minibatch switches to
+  MiniBatchKMeans for large member files
+- DBSCAN grid (eps x min_samples): one radius-neighbour graph (KD-tree) is
+  built at the largest eps and every combination runs DBSCAN on it with
+  metric='precomputed', which only keeps the edges within its own eps
+- silhouette scores reuse one pairwise distance matrix (on a fixed sample of
+  at most --silhouette-sample members)
+
+--baseline also runs the notebook's loops (float64, fresh neighbour search
+per DBSCAN run) and reports the speedup.
+
+Usage:
+    python cluster_explorer.py [--data EastWestAirlines.xlsx] [--n-jobs -1]
+                               [--minibatch] [--baseline] [--out exploration.json]
+"""
+
+import argparse
+import json
+import time
+import warnings
+
+import numpy as np
+import pandas as pd
+from joblib import Parallel, delayed
+from sklearn.cluster import DBSCAN, KMeans, MiniBatchKMeans
+from sklearn.metrics import pairwise_distances, silhouette_score
+from sklearn.neighbors import NearestNeighbors, sort_graph_by_row_values
+from sklearn.preprocessing import StandardScaler
+
+K_RANGE = range(1, 11)
+EPS_VALUES = [0.5, 0.7, 1.0, 1.2, 1.5]
+MIN_SAMPLES_VALUES = [5, 10, 15, 20]
+
+
+def load_members(path):
+    """Member data (the second sheet when the workbook has one) and its feature columns"""
+    sheets = pd.ExcelFile(path).sheet_names
+    df = pd.read_excel(path, sheet_name=sheets[1] if len(sheets) > 1 else sheets[0])
+    return df, df.columns.drop('ID#')
+
+
+def scale_features(df, features):
+    """StandardScaler output as one C-contiguous float32 array"""
+    return np.ascontiguousarray(StandardScaler().fit_transform(df[features]), dtype=np.float32)
+
+
+def _fit_k(X, k, minibatch):
+    start = time.perf_counter()
+    if minibatch:
+        model = MiniBatchKMeans(n_clusters=k, random_state=42, n_init='auto', batch_size=4096)
+    else:
+        model = KMeans(n_clusters=k, random_state=42, n_init='auto')
+    labels = model.fit_predict(X)
+    return {'k': k, 'wcss': float(model.inertia_), 'seconds': time.perf_counter() - start, 'labels': labels}
+
+
+def k_sweep(X, n_jobs=-1, minibatch=False):
+    # max_nbytes=0 memmaps X for every worker instead of pickling a copy to each
+    results = Parallel(n_jobs=n_jobs, max_nbytes=0)(delayed(_fit_k)(X, k, minibatch) for k in K_RANGE)
+    return sorted(results, key=lambda r: r['k'])
+
+
+def neighbor_graph(X, radius):
+    """Sparse distance graph of all pairs within radius, self-loops included and rows sorted"""
+    graph = NearestNeighbors(radius=radius, algorithm='kd_tree').fit(X).radius_neighbors_graph(mode='distance')
+    # DBSCAN adds the diagonal on every fit; storing it once keeps the rows sorted
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore')
+        graph.setdiag(graph.diagonal())
+    return sort_graph_by_row_values(graph, copy=False, warn_when_not_sorted=False)
+
+
+def silhouette_sample(X, size, seed=42):
+    """Fixed member sample and its pairwise distance matrix, shared by every score"""
+    rng = np.random.default_rng(seed)
+    idx = np.sort(rng.choice(len(X), size, replace=False)) if len(X) > size else np.arange(len(X))
+    return idx, pairwise_distances(X[idx], n_jobs=-1)
+
+
+def silhouette(labels, sample):
+    idx, distances = sample
+    labels = labels[idx]
+    if len(np.unique(labels)) < 2:
+        return None
+    return float(silhouette_score(distances, labels, metric='precomputed'))
+
+
+def dbscan_grid(graph, sample, eps_values=EPS_VALUES, min_samples_values=MIN_SAMPLES_VALUES):
+    """Every eps/min_samples combination on the shared graph (the notebook's scoring rules)"""
+    results = []
+    for eps in eps_values:
+        for min_samples in min_samples_values:
+            start = time.perf_counter()
+            labels = DBSCAN(eps=eps, min_samples=min_samples, metric='precomputed').fit_predict(graph)
+            n_clusters = len(set(labels)) - (1 if -1 in labels else 0)
+            score = silhouette(labels, sample) if n_clusters > 1 else None
+            results.append({
+                'eps': eps, 'min_samples': min_samples, 'clusters': n_clusters,
+                'noise': int((labels == -1).sum()), 'silhouette': score,
+                'seconds': time.perf_counter() - start,
+            })
+    return results
+
+
+def notebook_baseline(df, features):
+    """The notebook's serial elbow loop and DBSCAN grid, timed"""
+    df_scaled = pd.DataFrame(StandardScaler().fit_transform(df[features]), columns=features)
+    start = time.perf_counter()
+    for k in K_RANGE:
+        KMeans(n_clusters=k, random_state=42, n_init='auto').fit(df_scaled)
+    kmeans_s = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for eps in EPS_VALUES:
+        for min_samples in MIN_SAMPLES_VALUES:
+            clusters = DBSCAN(eps=eps, min_samples=min_samples).fit_predict(df_scaled)
+            n_clusters = len(set(clusters)) - (1 if -1 in clusters else 0)
+            if 1 < n_clusters < len(df_scaled):
+                silhouette_score(df_scaled, clusters)
+    return {'k_sweep': kmeans_s, 'dbscan_grid': time.perf_counter() - start}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="K sweep and DBSCAN grid for the airline members.")
+    parser.add_argument('--data', default='EastWestAirlines.xlsx')
+    parser.add_argument('--n-jobs', type=int, default=-1)
+    parser.add_argument('--minibatch', action='store_true', help="Use MiniBatchKMeans for the K sweep.")
+    parser.add_argument('--silhouette-sample', type=int, default=5000,
+                        help="Members used for silhouette scores (distance matrix is this size squared).")
+    parser.add_argument('--baseline', action='store_true', help="Also time the notebook's loops.")
+    parser.add_argument('--out', help="Write the results as JSON.")
+    args = parser.parse_args()
+
+    df, features = load_members(args.data)
+    timings = {}
+    start = time.perf_counter()
+    X = scale_features(df, features)
+    timings['scale'] = time.perf_counter() - start
+    print(f"{X.shape[0]:,} members x {X.shape[1]} features ({X.nbytes / 1e6:.2f} MB float32)")
+
+    start = time.perf_counter()
+    sweep = k_sweep(X, args.n_jobs, args.minibatch)
+    timings['k_sweep'] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    sample = silhouette_sample(X, args.silhouette_sample)
+    timings['distance_sample'] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for r in sweep:
+        r['silhouette'] = silhouette(r['labels'], sample)
+    timings['k_silhouette'] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    graph = neighbor_graph(X, max(EPS_VALUES))
+    timings['neighbor_graph'] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    grid = dbscan_grid(graph, sample)
+    timings['dbscan_grid'] = time.perf_counter() - start
+
+    print(f"\n{'K':>3} {'WCSS':>12} {'Silhouette':>11} {'Seconds':>8}")
+    for r in sweep:
+        score = r['silhouette']
+        print(f"{r['k']:>3} {r['wcss']:>12,.1f} {score if score is not None else float('nan'):>11.3f} "
+              f"{r['seconds']:>8.3f}")
+
+    print(f"\nNeighbour graph at eps={max(EPS_VALUES)}: {graph.nnz:,} edges "
+          f"({graph.nnz / X.shape[0]:.1f} per member)")
+    print(f"{'eps':>5} {'min_samples':>11} {'Clusters':>9} {'Noise':>7} {'Silhouette':>11} {'Seconds':>8}")
+    for r in grid:
+        score = r['silhouette'] if r['silhouette'] is not None else float('nan')
+        print(f"{r['eps']:>5.1f} {r['min_samples']:>11} {r['clusters']:>9} {r['noise']:>7,} "
+              f"{score:>11.3f} {r['seconds']:>8.3f}")
+    scored = [r for r in grid if r['silhouette'] is not None]
+    if scored:
+        best = max(scored, key=lambda r: r['silhouette'])
+        print(f"Best: eps={best['eps']}, min_samples={best['min_samples']} (silhouette {best['silhouette']:.3f})")
+
+    total = sum(timings.values())
+    print("\nCost: " + ', '.join(f"{stage} {seconds:.2f}s" for stage, seconds in timings.items())
+          + f", total {total:.2f}s")
+    if args.baseline:
+        baseline = notebook_baseline(df, features)
+        baseline_total = sum(baseline.values())
+        print(f"Notebook loops: K sweep {baseline['k_sweep']:.2f}s, DBSCAN grid {baseline['dbscan_grid']:.2f}s, "
+              f"total {baseline_total:.2f}s ({baseline_total / total:.1f}x slower)")
+
+    if args.out:
+        for r in sweep:
+            r.pop('labels')
+        with open(args.out, 'w', encoding='utf-8') as f:
+            json.dump({'k_sweep': sweep, 'dbscan': grid, 'timings': timings}, f, indent=2)
+        print(f"Wrote {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,191 @@
+"""
+Per-Label Corpus Statistics
+Token counts, document frequencies and n-gram counts per sentiment label,
+accumulated while the reviews are cleaned (text_pipeline.preprocess_stream
+with stats=...). Each worker counts its own chunk and the parent merges the
+Counters, so memory is the size of the distinct tokens and n-grams rather
+than the corpus: the notebook's ' '.join of every review per label and the
+.split() for Counter are no longer needed. Bigram counts are usually several
+times larger than the unigram vocabulary; --ngram-max 1 skips them.
+
+The counts feed WordCloud.generate_from_frequencies and the top-10 bar
+charts directly. generate() in the notebook ran WordCloud's own tokenizer
+(collocations, plural folding) on the joined text, so the clouds can differ
+slightly; the top-10 counts are identical.
+
+Usage:
+    python corpus_stats.py amazonreviews.csv [--out corpus_stats.json] [--plots]
+"""
+
+import argparse
+import collections
+import json
+import os
+import time
+
+LABEL_NAMES = {'pos': 'Positive', 'neg': 'Negative'}
+COLORMAPS = {'pos': 'Greens', 'neg': 'Reds'}
+
+
+class CorpusStats:
+    """Token, document and n-gram counts per label, mergeable across chunks"""
+
+    def __init__(self, ngram_max=2):
+        self.ngram_max = ngram_max
+        self.n_docs = collections.Counter()
+        self.token_counts = collections.defaultdict(collections.Counter)
+        self.doc_freq = collections.defaultdict(collections.Counter)
+        # label -> n -> Counter of space-joined n-grams (n >= 2); a plain dict
+        # so chunk stats pickle back from the pool workers
+        self.ngram_counts = {}
+
+    def ngrams(self, label):
+        """{n: Counter} of one label's n-grams, created on first use"""
+        if label not in self.ngram_counts:
+            self.ngram_counts[label] = {n: collections.Counter() for n in range(2, self.ngram_max + 1)}
+        return self.ngram_counts[label]
+
+    def update(self, labels, token_lists):
+        """Count one batch of tokenized reviews"""
+        for label, tokens in zip(labels, token_lists):
+            self.n_docs[label] += 1
+            self.token_counts[label].update(tokens)
+            self.doc_freq[label].update(set(tokens))
+            for n, ngrams in self.ngrams(label).items():
+                ngrams.update(' '.join(tokens[i:i + n]) for i in range(len(tokens) - n + 1))
+        return self
+
+    def merge(self, other):
+        self.n_docs.update(other.n_docs)
+        for mine, theirs in [(self.token_counts, other.token_counts),
+                             (self.doc_freq, other.doc_freq)]:
+            for label, counts in theirs.items():
+                mine[label].update(counts)
+        for label, by_n in other.ngram_counts.items():
+            for n, counts in by_n.items():
+                self.ngrams(label)[n].update(counts)
+        return self
+
+    @property
+    def labels(self):
+        return sorted(self.n_docs)
+
+    def frequencies(self, label):
+        """Token -> count, the input for WordCloud.generate_from_frequencies"""
+        return dict(self.token_counts[label])
+
+    def top(self, label, n=10, ngram=1):
+        if ngram == 1:
+            return self.token_counts[label].most_common(n)
+        if ngram > self.ngram_max:
+            raise ValueError(f"{ngram}-grams were not counted (ngram_max={self.ngram_max})")
+        return self.ngrams(label)[ngram].most_common(n)
+
+    def to_dict(self):
+        return {
+            'ngram_max': self.ngram_max,
+            'n_docs': dict(self.n_docs),
+            'token_counts': {label: dict(c) for label, c in self.token_counts.items()},
+            'doc_freq': {label: dict(c) for label, c in self.doc_freq.items()},
+            'ngram_counts': {label: {str(n): dict(c) for n, c in by_n.items()}
+                             for label, by_n in self.ngram_counts.items()},
+        }
+
+    @classmethod
+    def from_dict(cls, d):
+        stats = cls(d['ngram_max'])
+        stats.n_docs.update(d['n_docs'])
+        for attr in ['token_counts', 'doc_freq']:
+            for label, counts in d[attr].items():
+                getattr(stats, attr)[label].update(counts)
+        for label, by_n in d['ngram_counts'].items():
+            for n, counts in by_n.items():
+                stats.ngrams(label)[int(n)].update(counts)
+        return stats
+
+    def save(self, path):
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.to_dict(), f)
+
+    @classmethod
+    def load(cls, path):
+        with open(path, 'r', encoding='utf-8') as f:
+            return cls.from_dict(json.load(f))
+
+
+def plot_word_clouds(stats, path):
+    """The notebook's positive/negative word clouds, from the counts"""
+    import matplotlib.pyplot as plt
+    from wordcloud import WordCloud
+
+    plt.figure(figsize=(15, 7))
+    for i, label in enumerate(['pos', 'neg'], start=1):
+        cloud = WordCloud(width=800, height=400, background_color='white',
+                          colormap=COLORMAPS[label]).generate_from_frequencies(stats.frequencies(label))
+        plt.subplot(1, 2, i)
+        plt.imshow(cloud, interpolation='bilinear')
+        plt.title(f'Word Cloud for {LABEL_NAMES[label]} Reviews')
+        plt.axis('off')
+    plt.tight_layout()
+    plt.savefig(path)
+    plt.close()
+
+
+def plot_top_words(stats, path, n=10, ngram=1):
+    """The notebook's top-10 bar charts, from the counts"""
+    import matplotlib.pyplot as plt
+    import pandas as pd
+    import seaborn as sns
+
+    fig, axes = plt.subplots(1, 2, figsize=(18, 6))
+    for ax, label in zip(axes, ['pos', 'neg']):
+        top = pd.DataFrame(stats.top(label, n, ngram), columns=['Word', 'Count'])
+        sns.barplot(x='Word', y='Count', data=top, ax=ax, hue='Word',
+                    palette=f'{COLORMAPS[label]}_d', legend=False)
+        ax.set_title(f'Top {n} Most Common {LABEL_NAMES[label]} Words')
+        ax.set_xlabel('Word')
+        ax.set_ylabel('Frequency')
+        ax.tick_params(axis='x', rotation=45)
+    plt.tight_layout()
+    plt.savefig(path)
+    plt.close(fig)
+
+
+def main():
+    from text_pipeline import preprocess_stream
+
+    parser = argparse.ArgumentParser(description="Per-label token statistics for the review corpus.")
+    parser.add_argument('input', help="Tab-separated file with label and review columns.")
+    parser.add_argument('--out', default='corpus_stats.json')
+    parser.add_argument('--workers', type=int, default=os.cpu_count())
+    parser.add_argument('--chunksize', type=int, default=20_000)
+    parser.add_argument('--ngram-max', type=int, default=2)
+    parser.add_argument('--plots', action='store_true', help="Save word_clouds.png and top_words.png.")
+    args = parser.parse_args()
+
+    stats = CorpusStats(args.ngram_max)
+    start = time.perf_counter()
+    for _ in preprocess_stream(args.input, args.workers, args.chunksize, stats=stats):
+        pass
+    elapsed = time.perf_counter() - start
+
+    print(f"{sum(stats.n_docs.values()):,} reviews counted in {elapsed:.1f}s")
+    for label in stats.labels:
+        print(f"\n{LABEL_NAMES.get(label, label)}: {stats.n_docs[label]:,} reviews, "
+              f"{len(stats.token_counts[label]):,} distinct tokens")
+        print(f"  {'Word':<16} {'Count':>8} {'Docs':>8}")
+        for word, count in stats.top(label):
+            print(f"  {word:<16} {count:>8,} {stats.doc_freq[label][word]:>8,}")
+        if stats.ngram_max >= 2:
+            print("  Top bigrams: " + ', '.join(f"{gram} ({count})" for gram, count in stats.top(label, ngram=2)))
+
+    stats.save(args.out)
+    print(f"\nWrote {args.out}")
+    if args.plots:
+        plot_word_clouds(stats, 'word_clouds.png')
+        plot_top_words(stats, 'top_words.png')
+        print("Wrote word_clouds.png and top_words.png")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+"""
+Load Generator for the Sentiment Server
+Keeps --concurrency keep-alive connections busy against sentiment_server.py
+on localhost, one review per request, and reports throughput and latency
+percentiles. Run it against servers started with different --budget-ms /
+--max-batch values to see the batching trade-off.
+
+Usage:
+    python load_test.py [--url http://127.0.0.1:8000/predict] [--requests 5000]
+                        [--concurrency 64] [--reviews amazonreviews.csv]
+"""
+
+import argparse
+import asyncio
+import csv
+import itertools
+import json
+import time
+import urllib.parse
+
+SAMPLE_REVIEWS = [
+    "Great product, works exactly as described and arrived early.",
+    "Terrible quality, it broke after two days and support never answered.",
+    "Not bad for the price but the battery life could be better.",
+    "I love this book, could not put it down.",
+    "Waste of money. Do not buy.",
+]
+
+
+def load_reviews(path, limit=1000):
+    with open(path, 'r', encoding='utf-8', newline='') as f:
+        reader = csv.DictReader(f, delimiter='\t')
+        return [row['review'] for row in itertools.islice(reader, limit)]
+
+
+def percentile(sorted_values, q):
+    index = min(len(sorted_values) - 1, int(round(q / 100 * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+async def client(host, port, path, reviews, counter, latencies):
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        while True:
+            i = next(counter, None)
+            if i is None:
+                break
+            body = json.dumps({'review': reviews[i % len(reviews)]}).encode('utf-8')
+            request = (f"POST {path} HTTP/1.1\r\nHost: {host}\r\n"
+                       f"Content-Type: application/json\r\nContent-Length: {len(body)}\r\n\r\n")
+            start = time.perf_counter()
+            writer.write(request.encode('latin-1') + body)
+            await writer.drain()
+
+            status = await reader.readline()
+            length = 0
+            while True:
+                line = await reader.readline()
+                if line in (b'\r\n', b''):
+                    break
+                name, _, value = line.decode('latin-1').partition(':')
+                if name.lower() == 'content-length':
+                    length = int(value)
+            await reader.readexactly(length)
+            latencies.append(time.perf_counter() - start)
+            if b' 200 ' not in status:
+                raise SystemExit(f"Server answered {status.decode().strip()}")
+    finally:
+        writer.close()
+
+
+async def run(args):
+    url = urllib.parse.urlsplit(args.url)
+    reviews = load_reviews(args.reviews) if args.reviews else SAMPLE_REVIEWS
+    counter = iter(range(args.requests))
+    latencies = []
+    start = time.perf_counter()
+    await asyncio.gather(*[
+        client(url.hostname, url.port or 80, url.path, reviews, counter, latencies)
+        for _ in range(args.concurrency)
+    ])
+    elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    print(f"{len(latencies):,} requests, {args.concurrency} connections, {elapsed:.2f}s")
+    print(f"Throughput: {len(latencies) / elapsed:,.0f} req/s")
+    print(f"Latency ms: p50 {percentile(latencies, 50) * 1000:.1f}  "
+          f"p95 {percentile(latencies, 95) * 1000:.1f}  "
+          f"p99 {percentile(latencies, 99) * 1000:.1f}  "
+          f"max {latencies[-1] * 1000:.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test the sentiment server.")
+    parser.add_argument('--url', default='http://127.0.0.1:8000/predict')
+    parser.add_argument('--requests', type=int, default=5000)
+    parser.add_argument('--concurrency', type=int, default=64)
+    parser.add_argument('--reviews', help="Tab-separated review file to sample request bodies from.")
+    args = parser.parse_args()
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
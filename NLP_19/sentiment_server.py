@@ -0,0 +1,207 @@
+"""
+Micro-Batching Sentiment Server
+Local HTTP scoring service for the TF-IDF + LogisticRegression model saved
+by `python sentiment_training.py amazonreviews.csv --mode baseline --save`.
+
+The vectorizer and model are loaded once. Requests are queued and a single
+batcher task groups whatever arrives within --budget-ms (or up to
+--max-batch reviews) into one clean / transform / predict_proba call, run in
+a worker thread so the event loop keeps accepting connections.
+
+Endpoints:
+    POST /predict   {"review": "..."} or {"reviews": ["...", ...]}
+                    -> {"label": "pos", "probability": 0.97} (or {"results": [...]})
+    GET  /health    -> {"status": "ok", "batches": ..., "reviews": ...}
+
+Usage:
+    python sentiment_server.py [--port 8000] [--budget-ms 5] [--max-batch 256]
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import time
+
+import joblib
+import numpy as np
+
+from text_pipeline import clean_text, load_stop_words
+
+MODEL_DIR = 'models'
+VECTORIZER_FILE = os.path.join(MODEL_DIR, 'tfidf_logreg_vectorizer.joblib')
+MODEL_FILE = os.path.join(MODEL_DIR, 'tfidf_logreg_model.joblib')
+LABEL_NAMES = np.array(['neg', 'pos'])
+
+REASONS = {200: 'OK', 400: 'Bad Request', 404: 'Not Found', 405: 'Method Not Allowed',
+           500: 'Internal Server Error'}
+
+
+class SentimentScorer:
+    """Cleans, vectorizes and scores a list of reviews in one call"""
+
+    def __init__(self, vectorizer_path=VECTORIZER_FILE, model_path=MODEL_FILE):
+        self.vectorizer = joblib.load(vectorizer_path)
+        self.model = joblib.load(model_path)
+        self.stop_words = load_stop_words()
+
+    def score(self, reviews):
+        cleaned = [clean_text(text, self.stop_words) for text in reviews]
+        proba = self.model.predict_proba(self.vectorizer.transform(cleaned))[:, 1]
+        labels = LABEL_NAMES[(proba >= 0.5).astype(int)]
+        return [{'label': label, 'probability': round(float(p), 4)} for label, p in zip(labels, proba)]
+
+
+class MicroBatcher:
+    """Groups concurrent requests into batches under a latency budget"""
+
+    def __init__(self, scorer, budget_ms=5.0, max_batch=256):
+        self.scorer = scorer
+        self.budget = budget_ms / 1000
+        self.max_batch = max_batch
+        self.queue = asyncio.Queue()
+        self.batches = 0
+        self.reviews = 0
+
+    async def score(self, reviews):
+        future = asyncio.get_running_loop().create_future()
+        await self.queue.put((reviews, future))
+        return await future
+
+    async def run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            items = [await self.queue.get()]
+            size = len(items[0][0])
+            deadline = loop.time() + self.budget
+            while size < self.max_batch:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    item = await asyncio.wait_for(self.queue.get(), timeout)
+                except asyncio.TimeoutError:
+                    break
+                items.append(item)
+                size += len(item[0])
+
+            texts = [text for reviews, _ in items for text in reviews]
+            try:
+                results = await loop.run_in_executor(None, self.scorer.score, texts)
+            except Exception as exc:
+                for _, future in items:
+                    if not future.done():
+                        future.set_exception(exc)
+                continue
+            self.batches += 1
+            self.reviews += len(texts)
+            offset = 0
+            for reviews, future in items:
+                # A handler cancelled while waiting (client gone) leaves a done future
+                if not future.done():
+                    future.set_result(results[offset:offset + len(reviews)])
+                offset += len(reviews)
+
+
+async def read_request(reader):
+    """(method, path, headers, body) of one HTTP/1.1 request, None at EOF"""
+    request_line = await reader.readline()
+    if not request_line:
+        return None
+    method, path, _ = request_line.decode('latin-1').split(' ', 2)
+    headers = {}
+    while True:
+        line = await reader.readline()
+        if line in (b'\r\n', b'\n', b''):
+            break
+        name, _, value = line.decode('latin-1').partition(':')
+        headers[name.strip().lower()] = value.strip()
+    length = int(headers.get('content-length', 0))
+    body = await reader.readexactly(length) if length else b''
+    return method, path, headers, body
+
+
+def write_response(writer, status, payload, keep_alive):
+    body = json.dumps(payload).encode('utf-8')
+    head = (f"HTTP/1.1 {status} {REASONS[status]}\r\n"
+            f"Content-Type: application/json\r\n"
+            f"Content-Length: {len(body)}\r\n"
+            f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n")
+    writer.write(head.encode('latin-1') + body)
+
+
+async def handle(batcher, method, path, body):
+    if path == '/health':
+        return 200, {'status': 'ok', 'batches': batcher.batches, 'reviews': batcher.reviews}
+    if path != '/predict':
+        return 404, {'error': f'unknown path {path}'}
+    if method != 'POST':
+        return 405, {'error': 'use POST'}
+    try:
+        payload = json.loads(body)
+        single = 'review' in payload
+        reviews = [payload['review']] if single else list(payload['reviews'])
+        if not all(isinstance(text, str) for text in reviews):
+            raise TypeError
+    except (ValueError, KeyError, TypeError):
+        return 400, {'error': 'expected {"review": str} or {"reviews": [str, ...]}'}
+    try:
+        results = await batcher.score(reviews) if reviews else []
+    except Exception as exc:
+        return 500, {'error': f'scoring failed: {exc}'}
+    return 200, results[0] if single else {'results': results}
+
+
+async def serve_connection(batcher, reader, writer):
+    try:
+        while True:
+            request = await read_request(reader)
+            if request is None:
+                break
+            method, path, headers, body = request
+            keep_alive = headers.get('connection', '').lower() != 'close'
+            status, payload = await handle(batcher, method, path, body)
+            write_response(writer, status, payload, keep_alive)
+            await writer.drain()
+            if not keep_alive:
+                break
+    except (ConnectionError, asyncio.IncompleteReadError, ValueError):
+        pass
+    finally:
+        writer.close()
+
+
+async def serve(args):
+    start = time.perf_counter()
+    scorer = SentimentScorer(args.vectorizer, args.model)
+    print(f"Model loaded in {time.perf_counter() - start:.2f}s")
+    batcher = MicroBatcher(scorer, args.budget_ms, args.max_batch)
+    batch_task = asyncio.create_task(batcher.run())
+    server = await asyncio.start_server(
+        lambda reader, writer: serve_connection(batcher, reader, writer), args.host, args.port)
+    print(f"Serving on http://{args.host}:{args.port} "
+          f"(budget {args.budget_ms} ms, max batch {args.max_batch})")
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        batch_task.cancel()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve the sentiment model over HTTP.")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8000)
+    parser.add_argument('--budget-ms', type=float, default=5.0, help="Longest wait to fill a batch.")
+    parser.add_argument('--max-batch', type=int, default=256, help="Reviews per batch (1 disables batching).")
+    parser.add_argument('--vectorizer', default=VECTORIZER_FILE)
+    parser.add_argument('--model', default=MODEL_FILE)
+    args = parser.parse_args()
+    try:
+        asyncio.run(serve(args))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,198 @@
+"""
+Sentiment Model Training: streaming vs in-memory
+Two ways to train the review sentiment classifier:
+
+stream    Reviews are read and cleaned chunk by chunk (text_pipeline), hashed
+          into a fixed 2^20-wide sparse space (HashingVectorizer, no
+          vocabulary) and fed to SGDClassifier(loss='log_loss').partial_fit.
+          Memory does not depend on the number of reviews. Duplicate reviews
+          are kept unless --dedupe is given: dropping them needs a set of
+          row hashes that grows with the number of distinct reviews.
+baseline  The notebook: whole file in memory, TfidfVectorizer(max_features=5000)
+          and LogisticRegression(max_iter=1000).
+
+Both use the same held-out rows: a review is held out when the hash of its
+text falls in the test fraction, so the split needs no shuffling or memory.
+In stream mode held-out rows are scored before each chunk is trained on
+(progressive validation) and a capped sample is kept for the final score.
+Duplicates share a hash, so they never straddle the split.
+
+Peak RSS is reported for the training process and for the largest cleaning
+worker (stream mode cleans in a process pool; the baseline has no workers).
+
+Usage:
+    python sentiment_training.py amazonreviews.csv --mode stream [--chunksize 20000] [--dedupe]
+    python sentiment_training.py amazonreviews.csv --mode baseline [--save]
+    python sentiment_training.py amazonreviews.csv --mode compare
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from common.resources import peak_rss_mb
+
+LABELS = {'neg': 0, 'pos': 1}
+TEST_FRACTION = 0.2
+HOLDOUT_CAP = 50_000
+MODEL_DIR = 'models'
+
+
+def is_holdout(reviews):
+    """Deterministic test-split mask from the review text"""
+    hashes = pd.util.hash_pandas_object(pd.Series(reviews), index=False).to_numpy()
+    return (hashes % 1000) < TEST_FRACTION * 1000
+
+
+def make_hashing_vectorizer(ngram_max=2):
+    from sklearn.feature_extraction.text import HashingVectorizer
+    return HashingVectorizer(n_features=2 ** 20, ngram_range=(1, ngram_max),
+                             alternate_sign=False, norm='l2')
+
+
+def train_stream(path, chunksize, workers, ngram_max=2, dedupe=False):
+    from scipy import sparse
+    from sklearn.linear_model import SGDClassifier
+    from text_pipeline import preprocess_stream
+
+    vectorizer = make_hashing_vectorizer(ngram_max)
+    model = SGDClassifier(loss='log_loss', alpha=1e-6, random_state=42)
+    classes = np.array([0, 1])
+    holdout_X, holdout_y = [], []
+    held = 0
+    correct = seen = trained = 0
+
+    for chunk in preprocess_stream(path, workers, chunksize, dedupe=dedupe):
+        X = vectorizer.transform(chunk['cleaned_review'])
+        y = chunk['label'].map(LABELS).to_numpy()
+        test = is_holdout(chunk['review'])
+
+        # Progressive validation: score unseen held-out rows with the current model
+        if trained and test.any():
+            correct += int((model.predict(X[test]) == y[test]).sum())
+            seen += int(test.sum())
+        if held < HOLDOUT_CAP and test.any():
+            take = np.flatnonzero(test)[:HOLDOUT_CAP - held]
+            holdout_X.append(X[take])
+            holdout_y.append(y[take])
+            held += len(take)
+
+        model.partial_fit(X[~test], y[~test], classes=classes)
+        trained += int((~test).sum())
+        running = f"{correct / seen:.4f}" if seen else "n/a"
+        print(f"  {trained:,} reviews trained, running held-out accuracy {running}")
+
+    X_test = sparse.vstack(holdout_X)
+    y_test = np.concatenate(holdout_y)
+    return vectorizer, model, X_test, y_test, trained
+
+
+def train_baseline(path):
+    from sklearn.feature_extraction.text import TfidfVectorizer
+    from sklearn.linear_model import LogisticRegression
+    from text_pipeline import clean_text, load_stop_words
+
+    df = pd.read_csv(path, sep='\t').drop_duplicates()
+    stop_words = load_stop_words()
+    df['cleaned_review'] = df['review'].apply(lambda text: clean_text(text, stop_words))
+    y = df['label'].map(LABELS).to_numpy()
+    test = is_holdout(df['review'])
+
+    vectorizer = TfidfVectorizer(max_features=5000)
+    X_train = vectorizer.fit_transform(df['cleaned_review'][~test])
+    model = LogisticRegression(random_state=42, max_iter=1000)
+    model.fit(X_train, y[~test])
+    return vectorizer, model, vectorizer.transform(df['cleaned_review'][test]), y[test], int((~test).sum())
+
+
+def _round(mb):
+    return round(mb, 1) if mb is not None else None
+
+
+def run(args):
+    from sklearn.metrics import accuracy_score
+    start = time.perf_counter()
+    if args.mode == 'stream':
+        vectorizer, model, X_test, y_test, n_train = train_stream(
+            args.input, args.chunksize, args.workers, args.ngram_max, args.dedupe)
+    else:
+        vectorizer, model, X_test, y_test, n_train = train_baseline(args.input)
+    elapsed = time.perf_counter() - start
+
+    result = {
+        'mode': args.mode,
+        'train_reviews': n_train,
+        'test_reviews': int(len(y_test)),
+        'accuracy': round(float(accuracy_score(y_test, model.predict(X_test))), 4),
+        'seconds': round(elapsed, 2),
+        'peak_rss_mb': _round(peak_rss_mb()),
+        # The pool has been closed and joined by now, so its workers are counted
+        'peak_worker_rss_mb': _round(peak_rss_mb(children=True)),
+    }
+    if args.save:
+        import joblib
+        os.makedirs(MODEL_DIR, exist_ok=True)
+        prefix = 'hashing_sgd' if args.mode == 'stream' else 'tfidf_logreg'
+        joblib.dump(vectorizer, os.path.join(MODEL_DIR, f'{prefix}_vectorizer.joblib'))
+        joblib.dump(model, os.path.join(MODEL_DIR, f'{prefix}_model.joblib'))
+        result['saved'] = os.path.join(MODEL_DIR, prefix + '_*.joblib')
+    return result
+
+
+def compare(args):
+    """Each mode in its own process so peak RSS is measured separately"""
+    results = []
+    for mode in ['baseline', 'stream']:
+        cmd = [sys.executable, os.path.abspath(__file__), args.input, '--mode', mode, '--json',
+               '--chunksize', str(args.chunksize), '--workers', str(args.workers),
+               '--ngram-max', str(args.ngram_max)]
+        if args.dedupe:
+            cmd.append('--dedupe')
+        out = subprocess.run(cmd, capture_output=True, text=True)
+        if out.returncode != 0:
+            raise SystemExit(f"{mode} run failed:\n{out.stderr}")
+        results.append(json.loads(out.stdout.strip().splitlines()[-1]))
+
+    print(f"\n{'Mode':<10} {'Train':>9} {'Test':>8} {'Accuracy':>9} {'Seconds':>8} "
+          f"{'Peak RSS MB':>12} {'Worker MB':>10}")
+    for r in results:
+        worker = r['peak_worker_rss_mb'] if r['mode'] == 'stream' else None
+        print(f"{r['mode']:<10} {r['train_reviews']:>9,} {r['test_reviews']:>8,} {r['accuracy']:>9.4f} "
+              f"{r['seconds']:>8.1f} {r['peak_rss_mb'] or float('nan'):>12.1f} "
+              f"{worker or float('nan'):>10.1f}")
+    print("Worker MB: largest cleaning worker; stream runs --workers of them at once.")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Train the review sentiment model.")
+    parser.add_argument('input', help="Tab-separated file with label and review columns.")
+    parser.add_argument('--mode', choices=['stream', 'baseline', 'compare'], default='stream')
+    parser.add_argument('--chunksize', type=int, default=20_000)
+    parser.add_argument('--workers', type=int, default=os.cpu_count())
+    parser.add_argument('--ngram-max', type=int, default=2, help="Largest n-gram hashed in stream mode.")
+    parser.add_argument('--dedupe', action='store_true',
+                        help="Drop duplicate reviews in stream mode (memory grows with distinct reviews).")
+    parser.add_argument('--save', action='store_true', help=f"Save vectorizer and model under {MODEL_DIR}/.")
+    parser.add_argument('--json', action='store_true', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.mode == 'compare':
+        compare(args)
+        return
+    result = run(args)
+    if args.json:
+        print(json.dumps(result))
+    else:
+        for key, value in result.items():
+            print(f"{key}: {value}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,223 @@
+"""
+Streaming Review Preprocessor
+Produces the notebook's cleaned_review column (lowercase, strip everything
+but ASCII letters and whitespace, word_tokenize, drop English stopwords)
+for review files of any size:
+
+- the file is read in chunks and the chunks are cleaned across a process pool
+  (bounded number in flight, results written in input order as they finish)
+- cleaning uses precompiled regexes and a frozenset of stopwords instead of
+  nltk.word_tokenize; the output is identical (see clean_text)
+- duplicate (label, review) rows are dropped as in the notebook, keeping the
+  first occurrence, using 8-byte hashes instead of the rows
+- optionally, per-label token statistics (corpus_stats.CorpusStats) are
+  counted in the workers from the same tokens and merged in order
+
+Usage:
+    python text_pipeline.py amazonreviews.csv cleaned_reviews.tsv [--workers 8]
+    python text_pipeline.py amazonreviews.csv --benchmark [--replicate 20]
+"""
+
+import argparse
+import collections
+import multiprocessing
+import os
+import re
+import time
+
+import pandas as pd
+
+from corpus_stats import CorpusStats
+
+# The notebook's cleaning regex
+NON_LETTERS = re.compile(r'[^a-zA-Z\s]')
+
+# After NON_LETTERS only letters and whitespace remain, and on such text
+# word_tokenize reduces to str.split() plus these splits of the Treebank
+# tokenizer (CONTRACTIONS2, matched on whole lowercase words)
+TREEBANK_SPLITS = {
+    'cannot': ('can', 'not'),
+    'gimme': ('gim', 'me'),
+    'gonna': ('gon', 'na'),
+    'gotta': ('got', 'ta'),
+    'lemme': ('lem', 'me'),
+    'wanna': ('wan', 'na'),
+}
+
+# Per-worker state, set once by _init_worker
+_stop_words = frozenset()
+
+
+def load_stop_words():
+    """NLTK English stopwords as a frozenset"""
+    import nltk
+    nltk.download('stopwords', quiet=True)
+    from nltk.corpus import stopwords
+    return frozenset(stopwords.words('english'))
+
+
+def tokenize(text, stop_words):
+    """Cleaned tokens of one review, identical to the notebook's preprocess_text"""
+    tokens = []
+    for word in NON_LETTERS.sub('', text.lower()).split():
+        parts = TREEBANK_SPLITS.get(word)
+        if parts is None:
+            if word not in stop_words:
+                tokens.append(word)
+        else:
+            tokens.extend(part for part in parts if part not in stop_words)
+    return tokens
+
+
+def clean_text(text, stop_words):
+    return ' '.join(tokenize(text, stop_words))
+
+
+def _init_worker(stop_words):
+    global _stop_words
+    _stop_words = stop_words
+
+
+def _clean_chunk(chunk, ngram_max=None):
+    """Add cleaned_review and n_tokens to a chunk (and count it if ngram_max is set)"""
+    token_lists = [tokenize(text, _stop_words) for text in chunk['review']]
+    chunk['cleaned_review'] = [' '.join(tokens) for tokens in token_lists]
+    chunk['n_tokens'] = [len(tokens) for tokens in token_lists]
+    if ngram_max is None:
+        return chunk
+    return chunk, CorpusStats(ngram_max).update(chunk['label'], token_lists)
+
+
+def read_reviews(path, chunksize, dedupe=True):
+    """Yield review chunks (tab-separated label/review file), duplicates removed.
+
+    Dedupe keeps one hash per distinct row seen so far, so its memory grows
+    with the file; pass dedupe=False where memory must stay constant.
+    """
+    seen = set()
+    for chunk in pd.read_csv(path, sep='\t', chunksize=chunksize):
+        if dedupe:
+            keys = pd.util.hash_pandas_object(chunk, index=False).to_numpy()
+            keep = []
+            for key in keys:
+                keep.append(key not in seen)
+                seen.add(key)
+            chunk = chunk[keep]
+        if len(chunk):
+            yield chunk
+
+
+def preprocess_stream(path, workers=None, chunksize=20_000, dedupe=True, stop_words=None, stats=None):
+    """Yield cleaned chunks in input order while the pool works ahead
+
+    If stats (a CorpusStats) is given, each chunk's counts are merged into it
+    before the chunk is yielded.
+    """
+    stop_words = stop_words if stop_words is not None else load_stop_words()
+    workers = workers or os.cpu_count()
+    ngram_max = stats.ngram_max if stats is not None else None
+
+    def collect(result):
+        if stats is None:
+            return result.get()
+        chunk, chunk_stats = result.get()
+        stats.merge(chunk_stats)
+        return chunk
+
+    # Bounded number of chunks in flight keeps memory flat for any file size
+    max_pending = 2 * workers
+    pending = collections.deque()
+    with multiprocessing.Pool(workers, initializer=_init_worker, initargs=(stop_words,)) as pool:
+        for chunk in read_reviews(path, chunksize, dedupe):
+            if len(pending) >= max_pending:
+                yield collect(pending.popleft())
+            pending.append(pool.apply_async(_clean_chunk, (chunk, ngram_max)))
+        while pending:
+            yield collect(pending.popleft())
+
+
+def nltk_preprocess(texts, stop_words):
+    """The notebook's function, for the benchmark and the equality check"""
+    from nltk.tokenize import word_tokenize
+
+    def preprocess_text(text):
+        text = text.lower()
+        text = re.sub(r'[^a-zA-Z\s]', '', text)
+        tokens = word_tokenize(text)
+        tokens = [word for word in tokens if word not in stop_words]
+        return ' '.join(tokens)
+
+    return [preprocess_text(text) for text in texts]
+
+
+def benchmark(path, replicate, chunksize):
+    import tempfile
+    import nltk
+    nltk.download('punkt', quiet=True)
+    nltk.download('punkt_tab', quiet=True)
+    stop_words = load_stop_words()
+
+    df = pd.read_csv(path, sep='\t')
+    sample = df['review'].tolist()
+
+    start = time.perf_counter()
+    expected = nltk_preprocess(sample, stop_words)
+    nltk_rate = len(sample) / (time.perf_counter() - start)
+
+    start = time.perf_counter()
+    got = [clean_text(text, stop_words) for text in sample]
+    fast_rate = len(sample) / (time.perf_counter() - start)
+
+    mismatches = sum(a != b for a, b in zip(expected, got))
+    print(f"Output differs from the notebook's function on {mismatches} of {len(sample):,} reviews")
+
+    # Larger file for the parallel runs; dedupe is off so every copy is cleaned
+    with tempfile.TemporaryDirectory() as tmp:
+        big_path = os.path.join(tmp, 'reviews.tsv')
+        pd.concat([df] * replicate).to_csv(big_path, sep='\t', index=False)
+        n_docs = len(df) * replicate
+
+        print(f"\n{'':<24} {'docs/s':>10} {'speedup':>8}")
+        print(f"{'nltk apply (1 core)':<24} {nltk_rate:>10,.0f} {1:>8.1f}")
+        print(f"{'precompiled (1 core)':<24} {fast_rate:>10,.0f} {fast_rate / nltk_rate:>8.1f}")
+        workers = 1
+        while workers <= os.cpu_count():
+            start = time.perf_counter()
+            for _ in preprocess_stream(big_path, workers, chunksize, dedupe=False, stop_words=stop_words):
+                pass
+            rate = n_docs / (time.perf_counter() - start)
+            print(f"{f'stream, {workers} workers':<24} {rate:>10,.0f} {rate / nltk_rate:>8.1f}")
+            workers *= 2
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Clean Amazon reviews in parallel chunks.")
+    parser.add_argument('input', help="Tab-separated file with label and review columns.")
+    parser.add_argument('output', nargs='?', help="Tab-separated output with cleaned_review and n_tokens.")
+    parser.add_argument('--workers', type=int, default=os.cpu_count())
+    parser.add_argument('--chunksize', type=int, default=20_000)
+    parser.add_argument('--keep-duplicates', action='store_true')
+    parser.add_argument('--benchmark', action='store_true', help="Measure docs/s instead of writing output.")
+    parser.add_argument('--replicate', type=int, default=20, help="Copies of the input for the benchmark.")
+    args = parser.parse_args()
+
+    if args.benchmark:
+        benchmark(args.input, args.replicate, args.chunksize)
+        return
+    if not args.output:
+        parser.error("output is required unless --benchmark is given")
+
+    start = time.perf_counter()
+    n_docs = 0
+    with open(args.output, 'w', encoding='utf-8', newline='') as out:
+        for i, chunk in enumerate(preprocess_stream(args.input, args.workers, args.chunksize,
+                                                    dedupe=not args.keep_duplicates)):
+            chunk.to_csv(out, sep='\t', index=False, header=(i == 0))
+            n_docs += len(chunk)
+            elapsed = time.perf_counter() - start
+            print(f"  {n_docs:,} reviews cleaned ({n_docs / elapsed:,.0f} docs/s)")
+    print(f"Wrote {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,205 @@
+"""
+Startup Benchmark for the Streamlit Apps
+Runs each app headless with Streamlit's AppTest, in a fresh interpreter per
+repeat, and records:
+
+    import_ms        import time of the app's import chain, per top-level package
+    model_load_ms    loading the model artifacts (imports already warm)
+    first_render_ms  first script run: imports + model load + render
+    warm_rerun_ms    second run in the same process (cached resources)
+    peak_rss_mb      peak resident memory of the app process
+
+Each result is appended to benchmarks/startup_history.json and compared with
+the previous entry for the same app, so startup regressions show up.
+
+Usage:
+    python benchmarks/startup_benchmark.py [--app bike|diabetes|all] [--repeat 3]
+"""
+
+import argparse
+import ast
+import datetime
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.dirname(BENCH_DIR)
+
+sys.path.append(ROOT)
+from common.resources import peak_rss_mb
+HISTORY_FILE = os.path.join(BENCH_DIR, 'startup_history.json')
+
+APPS = {
+    'bike': os.path.join(ROOT, 'Bike_App', 'streamlit_app.py'),
+    'diabetes': os.path.join(ROOT, 'streamlit', 'streamlit_app.py'),
+}
+
+# A metric more than this fraction above the previous entry is flagged
+REGRESSION_TOLERANCE = 0.2
+
+
+def load_bike_model():
+    from model_registry import ModelRegistry
+    ModelRegistry()
+
+
+def load_diabetes_model():
+    from folded_scorer import FOLDED_MODEL_FILE, FoldedScorer
+    if os.path.exists(FOLDED_MODEL_FILE):
+        FoldedScorer.load(FOLDED_MODEL_FILE)
+    else:
+        import joblib
+        joblib.load('logistic_regression_model.joblib')
+        joblib.load('scaler.joblib')
+
+
+MODEL_LOADERS = {'bike': load_bike_model, 'diabetes': load_diabetes_model}
+
+
+def app_imports(app_path):
+    """Top-level modules imported by the app script"""
+    with open(app_path, 'r', encoding='utf-8') as f:
+        tree = ast.parse(f.read())
+    modules = []
+    for node in tree.body:
+        if isinstance(node, ast.Import):
+            modules.extend(alias.name for alias in node.names)
+        elif isinstance(node, ast.ImportFrom) and node.module and node.level == 0:
+            modules.append(node.module)
+    return list(dict.fromkeys(modules))
+
+
+def import_breakdown(app):
+    """Self import time summed per top-level package, from python -X importtime"""
+    app_path = APPS[app]
+    code = ''.join(f"import {module}\n" for module in app_imports(app_path))
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', code],
+                            cwd=os.path.dirname(app_path), capture_output=True, text=True)
+    totals = {}
+    for line in result.stderr.splitlines():
+        # "import time: self [us] | cumulative | imported package"
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, _, name = line[len('import time:'):].split('|')
+        package = name.strip().split('.')[0]
+        totals[package] = totals.get(package, 0.0) + int(self_us) / 1000
+    top = sorted(totals.items(), key=lambda item: item[1], reverse=True)
+    return {'total': round(sum(totals.values()), 1), **{k: round(v, 1) for k, v in top[:10]}}
+
+
+def run_child(app):
+    """Measure one cold start of the app in this (fresh) process"""
+    app_path = APPS[app]
+    app_dir = os.path.dirname(app_path)
+    os.chdir(app_dir)
+    sys.path.insert(0, app_dir)
+
+    from streamlit.testing.v1 import AppTest
+
+    at = AppTest.from_file(app_path, default_timeout=300)
+    start = time.perf_counter()
+    at.run()
+    first_render = time.perf_counter() - start
+    if at.exception:
+        raise SystemExit(f"{app} app raised: {at.exception[0].message}")
+
+    start = time.perf_counter()
+    at.run()
+    warm_rerun = time.perf_counter() - start
+
+    start = time.perf_counter()
+    MODEL_LOADERS[app]()
+    model_load = time.perf_counter() - start
+
+    peak = peak_rss_mb()
+    print(json.dumps({
+        'model_load_ms': round(model_load * 1000, 1),
+        'first_render_ms': round(first_render * 1000, 1),
+        'warm_rerun_ms': round(warm_rerun * 1000, 1),
+        'peak_rss_mb': round(peak, 1) if peak is not None else None,
+    }))
+
+
+def measure(app, repeat):
+    """Best of several cold starts, each in a fresh interpreter"""
+    runs = []
+    for _ in range(repeat):
+        cmd = [sys.executable, os.path.abspath(__file__), '--child', app]
+        out = subprocess.run(cmd, capture_output=True, text=True)
+        if out.returncode != 0:
+            raise SystemExit(f"{app} benchmark failed:\n{out.stderr or out.stdout}")
+        runs.append(json.loads(out.stdout.strip().splitlines()[-1]))
+    best = {key: min(run[key] for run in runs) for key in runs[0] if runs[0][key] is not None}
+    best['import_ms'] = import_breakdown(app)
+    return best
+
+
+def git_commit():
+    try:
+        out = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT,
+                             capture_output=True, text=True, check=True)
+        return out.stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def load_history():
+    if os.path.exists(HISTORY_FILE):
+        with open(HISTORY_FILE, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    return []
+
+
+def report(record, previous):
+    print(f"\n{record['app']}")
+    for key in ['model_load_ms', 'first_render_ms', 'warm_rerun_ms', 'peak_rss_mb']:
+        if key not in record:
+            continue
+        line = f"  {key:<16} {record[key]:>10.1f}"
+        if previous and previous.get(key):
+            change = record[key] / previous[key] - 1
+            flag = '  <-- regression' if change > REGRESSION_TOLERANCE else ''
+            line += f"   ({change:+.0%} vs {previous['commit'] or previous['timestamp']}){flag}"
+        print(line)
+    imports = dict(record['import_ms'])
+    total = imports.pop('total')
+    print(f"  import_ms        {total:>10.1f}   " +
+          ', '.join(f"{name} {ms:.0f}" for name, ms in imports.items()))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure Streamlit app startup.")
+    parser.add_argument('--app', choices=list(APPS) + ['all'], default='all')
+    parser.add_argument('--repeat', type=int, default=3, help="Cold starts per app (best is kept).")
+    parser.add_argument('--child', choices=list(APPS), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        run_child(args.child)
+        return
+
+    history = load_history()
+    apps = list(APPS) if args.app == 'all' else [args.app]
+    for app in apps:
+        record = {
+            'timestamp': datetime.datetime.now().isoformat(timespec='seconds'),
+            'commit': git_commit(),
+            'python': platform.python_version(),
+            'app': app,
+            **measure(app, args.repeat),
+        }
+        previous = next((r for r in reversed(history) if r['app'] == app), None)
+        report(record, previous)
+        history.append(record)
+
+    with open(HISTORY_FILE, 'w', encoding='utf-8') as f:
+        json.dump(history, f, indent=2)
+    print(f"\nAppended to {HISTORY_FILE}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,4 @@
+"""
+Helpers shared by the project folders (add the repository root to sys.path
+to import them, as Bike_App does for Bike_Sharing_Project).
+"""
@@ -0,0 +1,46 @@
+"""
+Atomic replacement of directory artifacts (column bundles, feature splits,
+compiled models, neighbour indexes).
+"""
+
+import contextlib
+import os
+import shutil
+import tempfile
+
+
+@contextlib.contextmanager
+def atomic_directory(path):
+    """Yield a temporary sibling directory and swap it in for path on success.
+
+    Readers see either the previous directory or the complete new one, never
+    a mix of old and new files (between the two renames path briefly does
+    not exist, which readers treat like a missing artifact). If the block
+    raises, the temporary directory is removed and path is left untouched.
+    Files already opened (or memory-mapped) from the previous directory stay
+    valid.
+    """
+    path = os.path.normpath(path)
+    parent = os.path.dirname(path) or '.'
+    os.makedirs(parent, exist_ok=True)
+    tmp = tempfile.mkdtemp(prefix=os.path.basename(path) + '.tmp-', dir=parent)
+    try:
+        yield tmp
+        os.chmod(tmp, 0o755)
+        if os.path.exists(path):
+            old = tempfile.mkdtemp(prefix=os.path.basename(path) + '.old-', dir=parent)
+            # A directory can only replace an empty one or nothing: move the
+            # previous artifact aside first, then drop it after the swap
+            previous = os.path.join(old, 'previous')
+            os.replace(path, previous)
+            try:
+                os.replace(tmp, path)
+            except OSError:
+                os.replace(previous, path)
+                raise
+            shutil.rmtree(old, ignore_errors=True)
+        else:
+            os.replace(tmp, path)
+    except BaseException:
+        shutil.rmtree(tmp, ignore_errors=True)
+        raise
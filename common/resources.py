@@ -0,0 +1,24 @@
+"""
+Process resource measurements for the benchmark and training reports.
+"""
+
+import platform
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+
+def peak_rss_mb(children=False):
+    """Peak resident memory of the current process (None where unsupported).
+
+    children=True gives the largest peak among its terminated, waited-for
+    child processes instead (e.g. the workers of a closed multiprocessing.Pool).
+    """
+    if resource is None:
+        return None
+    who = resource.RUSAGE_CHILDREN if children else resource.RUSAGE_SELF
+    peak = resource.getrusage(who).ru_maxrss
+    # ru_maxrss is in KB on Linux, bytes on macOS
+    return peak / (1024 * 1024) if platform.system() == 'Darwin' else peak / 1024
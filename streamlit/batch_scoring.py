@@ -0,0 +1,77 @@
+"""
+Bulk Patient Scoring
+Shared preprocessing rules and a chunked scorer for uploaded screening files.
+The zero-to-median rule is the one used by train_model.load_and_prepare_data,
+so uploaded rows are prepared exactly like the training data.
+"""
+
+import json
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+FEATURE_COLUMNS = ['Pregnancies', 'Glucose', 'BloodPressure', 'SkinThickness',
+                   'Insulin', 'BMI', 'DiabetesPedigreeFunction', 'Age']
+
+# Zero is a medical impossibility for these columns and means "not measured"
+ZERO_COLUMNS = ['Glucose', 'BloodPressure', 'SkinThickness', 'Insulin', 'BMI']
+
+MEDIANS_FILE = 'feature_medians.json'
+
+
+def feature_medians(df):
+    """Median of each feature with the zero placeholders treated as missing"""
+    features = df[FEATURE_COLUMNS].copy()
+    features[ZERO_COLUMNS] = features[ZERO_COLUMNS].replace(0, np.nan)
+    return {col: float(value) for col, value in features.median().items()}
+
+
+def save_medians(medians, path=MEDIANS_FILE):
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(medians, f, indent=2)
+
+
+def load_medians(base_path):
+    """Medians saved by train_model.py, or recomputed from diabetes.csv"""
+    base_path = Path(base_path)
+    if (base_path / MEDIANS_FILE).exists():
+        with open(base_path / MEDIANS_FILE, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    return feature_medians(pd.read_csv(base_path / 'diabetes.csv'))
+
+
+def missing_columns(columns):
+    """Training features absent from an uploaded header"""
+    return [col for col in FEATURE_COLUMNS if col not in columns]
+
+
+def impute_zeros(df, medians):
+    """Feature matrix (float64, training column order) with zeros and blanks
+    in the medical columns and blanks elsewhere replaced by the medians"""
+    features = df[FEATURE_COLUMNS].apply(pd.to_numeric, errors='coerce')
+    features[ZERO_COLUMNS] = features[ZERO_COLUMNS].replace(0, np.nan)
+    return features.fillna(medians)
+
+
+def score_chunks(reader, scorer, medians, threshold=0.5):
+    """Score an iterable of DataFrame chunks; yields (scored chunk, stats).
+
+    scorer.predict_proba takes the raw (unscaled) feature matrix, e.g. a
+    folded_scorer.FoldedScorer.
+
+    Only one chunk is held at a time, so memory does not grow with the file.
+    """
+    for index, chunk in enumerate(reader):
+        start = time.perf_counter()
+        proba = scorer.predict_proba(impute_zeros(chunk, medians))[:, 1]
+        chunk['Diabetes_Probability'] = np.round(proba, 4)
+        chunk['Prediction'] = np.where(proba > threshold, 'Diabetic', 'Non-Diabetic')
+        elapsed = time.perf_counter() - start
+        yield chunk, {
+            'chunk': index,
+            'rows': len(chunk),
+            'latency_ms': round(elapsed * 1000, 2),
+            'rows_per_s': round(len(chunk) / max(elapsed, 1e-9)),
+        }
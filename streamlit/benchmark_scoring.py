@@ -0,0 +1,90 @@
+"""
+Scoring Benchmark: sklearn pickles vs folded NumPy scorer
+Measures, for both ways the app can score:
+- cold start: fresh interpreter, imports + loading the artifacts
+- single-patient latency (one-row DataFrame, as in the app)
+- bulk throughput (the dataset replicated to --rows rows)
+and checks that both give the same probabilities.
+
+Run after train_model.py:
+    python benchmark_scoring.py [--rows 100000]
+"""
+
+import argparse
+import subprocess
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+COLD_START = {
+    'sklearn': (
+        "import time; t = time.perf_counter()\n"
+        "import joblib, pandas, sklearn.linear_model\n"
+        "joblib.load('logistic_regression_model.joblib'); joblib.load('scaler.joblib')\n"
+        "print(time.perf_counter() - t)"
+    ),
+    'folded': (
+        "import time; t = time.perf_counter()\n"
+        "from folded_scorer import FoldedScorer\n"
+        "FoldedScorer.load('folded_model.json')\n"
+        "print(time.perf_counter() - t)"
+    ),
+}
+
+
+def cold_start_ms(code, repeat=5):
+    """Best of several fresh-interpreter runs"""
+    times = []
+    for _ in range(repeat):
+        out = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True, check=True)
+        times.append(float(out.stdout.strip()) * 1000)
+    return min(times)
+
+
+def best_ms(func, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def main():
+    import joblib
+    from batch_scoring import impute_zeros, load_medians
+    from folded_scorer import FoldedScorer, ScaledModelScorer
+
+    parser = argparse.ArgumentParser(description="Compare the sklearn and folded scorers.")
+    parser.add_argument('--rows', type=int, default=100_000)
+    args = parser.parse_args()
+
+    scorers = {
+        'sklearn': ScaledModelScorer(joblib.load('logistic_regression_model.joblib'),
+                                     joblib.load('scaler.joblib')),
+        'folded': FoldedScorer.load('folded_model.json'),
+    }
+
+    X = impute_zeros(pd.read_csv('diabetes.csv'), load_medians('.'))
+    expected = scorers['sklearn'].predict_proba(X)
+    got = scorers['folded'].predict_proba(X)
+    max_diff = float(np.abs(expected - got).max())
+    print(f"Max abs probability difference on {len(X)} patients: {max_diff:.2e}")
+    if max_diff > 1e-9:
+        raise SystemExit("Folded scorer does not match the sklearn model.")
+
+    one_row = X.iloc[[0]]
+    bulk = pd.concat([X] * (args.rows // len(X) + 1), ignore_index=True).iloc[:args.rows]
+
+    print(f"\n{'':<10} {'Cold start ms':>14} {'1 row ms':>10} {'Bulk rows/s':>13}")
+    for name, scorer in scorers.items():
+        cold = cold_start_ms(COLD_START[name])
+        single = best_ms(lambda: scorer.predict_proba(one_row), 200)
+        bulk_ms = best_ms(lambda: scorer.predict_proba(bulk), 5)
+        print(f"{name:<10} {cold:>14.1f} {single:>10.3f} {len(bulk) / (bulk_ms / 1000):>13,.0f}")
+
+
+if __name__ == "__main__":
+    main()
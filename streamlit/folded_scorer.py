@@ -0,0 +1,111 @@
+"""
+Folded Logistic Regression Scorer
+The StandardScaler is affine, so it can be merged into the logistic
+regression weights:
+
+    z = w . (x - mean) / scale + b = (w / scale) . x + (b - w . mean / scale)
+
+train_model.py exports the folded weights to folded_model.json, and this
+module scores with NumPy only (no sklearn, no joblib, no pickles). The
+probabilities match scaler + model.predict_proba to floating-point rounding.
+"""
+
+import json
+from pathlib import Path
+
+import numpy as np
+
+FOLDED_MODEL_FILE = 'folded_model.json'
+# Decision threshold for the pickle fallback (folded_model.json carries its own)
+THRESHOLD_FILE = 'decision_threshold.json'
+
+
+def fold_model(model, scaler, feature_order, medians=None, threshold=0.5):
+    """JSON-ready dict for a fitted binary LogisticRegression and its StandardScaler"""
+    mean = scaler.mean_ if scaler.with_mean else np.zeros(len(feature_order))
+    scale = scaler.scale_ if scaler.with_std else np.ones(len(feature_order))
+    coef = model.coef_[0] / scale
+    intercept = float(model.intercept_[0] - np.dot(coef, mean))
+    return {
+        'feature_order': list(feature_order),
+        'coef': [float(c) for c in coef],
+        'intercept': intercept,
+        'medians': medians or {},
+        'threshold': float(threshold),
+    }
+
+
+def save_folded(folded, path=FOLDED_MODEL_FILE):
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(folded, f, indent=2)
+
+
+def save_threshold(threshold, path=THRESHOLD_FILE):
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump({'threshold': float(threshold)}, f, indent=2)
+
+
+def load_threshold(base_path):
+    """Threshold saved by train_model.py next to the pickles, 0.5 for older exports"""
+    path = Path(base_path) / THRESHOLD_FILE
+    if not path.exists():
+        return 0.5
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)['threshold']
+
+
+class FoldedScorer:
+    """Drop-in for scaler + model.predict_proba on raw (unscaled) features"""
+
+    def __init__(self, folded):
+        self.feature_order = folded['feature_order']
+        self.coef = np.asarray(folded['coef'], dtype=np.float64)
+        self.intercept = folded['intercept']
+        self.medians = folded.get('medians', {})
+        self.threshold = folded.get('threshold', 0.5)
+
+    @classmethod
+    def load(cls, path):
+        with open(path, 'r', encoding='utf-8') as f:
+            return cls(json.load(f))
+
+    def _as_array(self, X):
+        """DataFrames are matched to feature_order by column name; arrays must already be in it"""
+        if hasattr(X, 'columns'):
+            missing = [col for col in self.feature_order if col not in X.columns]
+            if missing:
+                raise ValueError(f"Missing feature columns: {', '.join(missing)}")
+            X = X[self.feature_order]
+        X = np.asarray(X, dtype=np.float64)
+        if X.ndim != 2 or X.shape[1] != len(self.feature_order):
+            raise ValueError(f"Expected {len(self.feature_order)} features ({', '.join(self.feature_order)}), "
+                             f"got shape {X.shape}")
+        return X
+
+    def decision_function(self, X):
+        """X: DataFrame with the feature_order columns (any order), or an array in feature_order"""
+        return self._as_array(X) @ self.coef + self.intercept
+
+    def predict_proba(self, X):
+        """(n, 2) array of [P(non-diabetic), P(diabetic)], like sklearn"""
+        z = self.decision_function(X)
+        # exp of a non-positive number cannot overflow
+        ez = np.exp(-np.abs(z))
+        positive = np.where(z >= 0, 1.0 / (1.0 + ez), ez / (1.0 + ez))
+        return np.column_stack([1.0 - positive, positive])
+
+    def predict(self, X):
+        return (self.predict_proba(X)[:, 1] > self.threshold).astype(int)
+
+
+class ScaledModelScorer:
+    """scaler + sklearn model behind the same interface (fallback when only
+    the pickles are deployed)"""
+
+    def __init__(self, model, scaler, threshold=0.5):
+        self.model = model
+        self.scaler = scaler
+        self.threshold = threshold
+
+    def predict_proba(self, X):
+        return self.model.predict_proba(self.scaler.transform(X))
@@ -1,14 +1,21 @@
 import streamlit as st
-import joblib
 import pandas as pd
 import numpy as np
 import os
+import tempfile
+import time
 from pathlib import Path
+from batch_scoring import load_medians, missing_columns, score_chunks
+from folded_scorer import FOLDED_MODEL_FILE, FoldedScorer, ScaledModelScorer, load_threshold
 
-# Load the trained model and scaler
+CHUNK_SIZE = 5000
+
+
+# Load the trained model: the folded NumPy scorer when available (no sklearn
+# import, no unpickling), otherwise the model and scaler pickles
 @st.cache_resource
 def load_model_and_scaler():
-    """Load model and scaler from multiple possible locations"""
+    """Load the scorer and imputation medians from multiple possible locations"""
     
     # Define possible paths to search for model files
     possible_paths = [
@@ -29,6 +36,11 @@ def load_model_and_scaler():
     
     # Search for model files
     for base_path in possible_paths:
+        folded_path = base_path / FOLDED_MODEL_FILE
+        if folded_path.exists():
+            scorer = FoldedScorer.load(folded_path)
+            return scorer, scorer.medians or load_medians(base_path)
+
         model_path = base_path / 'logistic_regression_model.joblib'
         scaler_path = base_path / 'scaler.joblib'
         
@@ -43,12 +55,12 @@ def load_model_and_scaler():
         ### Model files not found!
         
         Please ensure the following files are in the same directory as `streamlit_app.py`:
-        - `logistic_regression_model.joblib`
-        - `scaler.joblib`
+        - `folded_model.json` (preferred), or
+        - `logistic_regression_model.joblib` and `scaler.joblib`
         
         **To generate these files:**
         1. Run `python train_model.py` in your project directory
-        2. Upload the generated `.joblib` files to your GitHub repository
+        2. Upload the generated `folded_model.json` and `.joblib` files to your GitHub repository
         3. Make sure they're in the same folder as `streamlit_app.py`
         
         **Current search paths:**
@@ -59,22 +71,69 @@ def load_model_and_scaler():
     
     # Load the model and scaler
     try:
+        import joblib
         model = joblib.load(model_file)
         scaler = joblib.load(scaler_file)
-        return model, scaler
+        medians = load_medians(model_file.parent)
+        return ScaledModelScorer(model, scaler, load_threshold(model_file.parent)), medians
     except Exception as e:
         st.error(f"Error loading model files: {str(e)}")
         st.stop()
 
-model, scaler = load_model_and_scaler()
+scorer, medians = load_model_and_scaler()
 
-st.set_page_config(page_title="Diabetes Prediction App", layout="centered")
-st.title("🏥 Diabetes Prediction App")
-st.write("Please enter the patient's details to predict the likelihood of diabetes.")
 
-# Sidebar for user input
-st.sidebar.header('Patient Data Input')
+def bulk_upload_mode():
+    """Score an uploaded screening file chunk by chunk"""
+    st.write("Upload a CSV with one patient per row. Required columns: "
+             "Pregnancies, Glucose, BloodPressure, SkinThickness, Insulin, BMI, "
+             "DiabetesPedigreeFunction, Age (other columns are kept in the output).")
+    uploaded = st.file_uploader("Screening file (CSV)", type=['csv'])
+    if uploaded is None:
+        return
+
+    header = pd.read_csv(uploaded, nrows=0).columns.tolist()
+    missing = missing_columns(header)
+    if missing:
+        st.error(f"Missing required columns: {', '.join(missing)}")
+        return
+    uploaded.seek(0)
+    total_rows = max(uploaded.getvalue().count(b'\n') - 1, 1)
+
+    if not st.button("Score file"):
+        return
+
+    progress = st.progress(0.0, text="Scoring...")
+    stats_table = st.empty()
+    stats = []
+    scored = 0
+    start = time.perf_counter()
+    # Results go straight to a temp file, so only one chunk is in memory; the
+    # file is removed even when scoring fails partway through
+    out = tempfile.NamedTemporaryFile('w+', suffix='.csv', newline='', delete=False)
+    try:
+        with out:
+            reader = pd.read_csv(uploaded, chunksize=CHUNK_SIZE)
+            for chunk, chunk_stats in score_chunks(reader, scorer, medians, scorer.threshold):
+                chunk.to_csv(out, index=False, header=(chunk_stats['chunk'] == 0))
+                scored += chunk_stats['rows']
+                stats.append(chunk_stats)
+                progress.progress(min(scored / total_rows, 1.0), text=f"Scored {scored:,} rows")
+                stats_table.dataframe(pd.DataFrame(stats), hide_index=True)
+        elapsed = time.perf_counter() - start
+
+        progress.progress(1.0, text="Done")
+        col1, col2, col3 = st.columns(3)
+        col1.metric("Patients scored", f"{scored:,}")
+        col2.metric("Throughput", f"{scored / max(elapsed, 1e-9):,.0f} rows/s")
+        col3.metric("Mean chunk latency", f"{np.mean([s['latency_ms'] for s in stats]):.1f} ms")
 
+        with open(out.name, 'rb') as f:
+            st.download_button("Download results", f, file_name=f"scored_{uploaded.name}", mime='text/csv')
+    finally:
+        os.remove(out.name)
+
+# Sidebar inputs for single-patient mode
 def user_input_features():
     pregnancies = st.sidebar.slider('Pregnancies', 0, 17, 3) # Min: 0, Max: 17, Default: 3 (from df.describe() mean/median)
     glucose = st.sidebar.slider('Glucose (mg/dL)', 44.0, 199.0, 117.0) # Min: 44, Max: 199, Default: 117 (from median)
@@ -98,30 +157,42 @@ def user_input_features():
     features = pd.DataFrame(data, index=[0])
     return features
 
-input_df = user_input_features()
-
-st.subheader('User Input:')
-st.write(input_df)
 
-# Scale the input features
-input_scaled = scaler.transform(input_df)
+st.set_page_config(page_title="Diabetes Prediction App", layout="centered")
+st.title("🏥 Diabetes Prediction App")
 
-# Make prediction
-prediction_proba = model.predict_proba(input_scaled)[:, 1]
-prediction = (prediction_proba > 0.5).astype(int)
+mode = st.sidebar.radio("Mode", ["Single patient", "Bulk CSV upload"])
 
-st.subheader('Prediction Result:')
-if prediction[0] == 1:
-    st.error(f"⚠️ The patient is predicted to be **Diabetic** with a probability of **{prediction_proba[0]:.2%}**")
+if mode == "Bulk CSV upload":
+    bulk_upload_mode()
 else:
-    st.success(f"✅ The patient is predicted to be **Non-Diabetic** with a probability of **{(1 - prediction_proba[0]):.2%}**")
-
-st.subheader('Prediction Probability:')
-col1, col2 = st.columns(2)
-with col1:
-    st.metric("Diabetes Risk", f"{prediction_proba[0]:.2%}")
-with col2:
-    st.metric("Non-Diabetes", f"{(1 - prediction_proba[0]):.2%}")
+    st.write("Please enter the patient's details to predict the likelihood of diabetes.")
+
+    # Sidebar for user input
+    st.sidebar.header('Patient Data Input')
+
+    input_df = user_input_features()
+
+    st.subheader('User Input:')
+    st.write(input_df)
+
+    # Make prediction
+    prediction_proba = scorer.predict_proba(input_df)[:, 1]
+    # Decision threshold tuned on cross-validated probabilities by train_model.py
+    prediction = (prediction_proba > scorer.threshold).astype(int)
+
+    st.subheader('Prediction Result:')
+    if prediction[0] == 1:
+        st.error(f"⚠️ The patient is predicted to be **Diabetic** with a probability of **{prediction_proba[0]:.2%}**")
+    else:
+        st.success(f"✅ The patient is predicted to be **Non-Diabetic** with a probability of **{(1 - prediction_proba[0]):.2%}**")
+
+    st.subheader('Prediction Probability:')
+    col1, col2 = st.columns(2)
+    with col1:
+        st.metric("Diabetes Risk", f"{prediction_proba[0]:.2%}")
+    with col2:
+        st.metric("Non-Diabetes", f"{(1 - prediction_proba[0]):.2%}")
 
 st.markdown("""
 --- 
@@ -2,15 +2,30 @@
 Diabetes Prediction Model Training Script
 This script trains a Logistic Regression model on the diabetes dataset
 and saves the model and scaler for use in the Streamlit app.
+
+By default the regularization strength C and the decision threshold are
+selected by stratified K-fold cross-validation on the training split
+(--search path); --search single fits the default C=1.0 with threshold 0.5.
+--compare also refits the grid without warm starts and prints both timings
+(this roughly doubles the search, so it is off for the Docker build).
+
+Usage:
+    python train_model.py [--search path|single] [--folds 5] [--n-jobs -1] [--compare]
 """
 
+import argparse
+import time
+
 import pandas as pd
 import numpy as np
-from sklearn.model_selection import train_test_split
+from sklearn.model_selection import StratifiedKFold, train_test_split
 from sklearn.preprocessing import StandardScaler
 from sklearn.linear_model import LogisticRegression
-from sklearn.metrics import accuracy_score, classification_report, confusion_matrix, roc_auc_score
+from sklearn.metrics import accuracy_score, classification_report, confusion_matrix, log_loss, roc_auc_score
 import joblib
+from joblib import Parallel, delayed
+from batch_scoring import FEATURE_COLUMNS, ZERO_COLUMNS, feature_medians, save_medians
+from folded_scorer import fold_model, save_folded, save_threshold
 
 def load_and_prepare_data(filepath='diabetes.csv'):
     """Load and prepare the diabetes dataset"""
@@ -27,8 +42,7 @@ def load_and_prepare_data(filepath='diabetes.csv'):
     print(f"\nMissing values:\n{df.isnull().sum()}")
     
     # Replace zero values with NaN for specific columns (medical impossibilities)
-    zero_columns = ['Glucose', 'BloodPressure', 'SkinThickness', 'Insulin', 'BMI']
-    for col in zero_columns:
+    for col in ZERO_COLUMNS:
         df[col] = df[col].replace(0, np.nan)
     
     # Fill missing values with median
@@ -39,8 +53,99 @@ def load_and_prepare_data(filepath='diabetes.csv'):
     
     return df
 
-def train_model(df):
-    """Train the logistic regression model"""
+# Regularization path, from strong to weak regularization
+C_GRID = np.logspace(-4, 2, 25)
+
+def _fold_path(X, y, train_idx, val_idx, Cs, warm_start):
+    """Fit every C on one fold; returns (val_idx, probabilities per C, fit seconds, solver iterations).
+
+    With warm_start each fit starts from the previous C's coefficients, which
+    are close to the new optimum, so the solver needs far fewer iterations.
+    """
+    scaler = StandardScaler().fit(X[train_idx])
+    X_fit, X_val = scaler.transform(X[train_idx]), scaler.transform(X[val_idx])
+    probabilities = np.empty((len(Cs), len(val_idx)))
+    model = LogisticRegression(max_iter=1000, random_state=42, warm_start=warm_start)
+    fit_seconds = 0.0
+    iterations = 0
+    for i, C in enumerate(Cs):
+        if not warm_start:
+            model = LogisticRegression(max_iter=1000, random_state=42)
+        model.set_params(C=C)
+        start = time.perf_counter()
+        model.fit(X_fit, y[train_idx])
+        fit_seconds += time.perf_counter() - start
+        iterations += int(model.n_iter_[0])
+        probabilities[i] = model.predict_proba(X_val)[:, 1]
+    return val_idx, probabilities, fit_seconds, iterations
+
+def cross_validated_path(X, y, Cs=C_GRID, n_splits=5, n_jobs=-1, warm_start=True):
+    """Out-of-fold probabilities for every C, with the folds run in parallel"""
+    X, y = np.asarray(X, dtype=np.float64), np.asarray(y)
+    folds = StratifiedKFold(n_splits=n_splits, shuffle=True, random_state=42).split(X, y)
+    start = time.perf_counter()
+    results = Parallel(n_jobs=n_jobs)(
+        delayed(_fold_path)(X, y, train_idx, val_idx, Cs, warm_start) for train_idx, val_idx in folds
+    )
+    wall_seconds = time.perf_counter() - start
+
+    oof = np.empty((len(Cs), len(y)))
+    for val_idx, probabilities, _, _ in results:
+        oof[:, val_idx] = probabilities
+    return oof, {
+        'wall_seconds': wall_seconds,
+        'fit_seconds': sum(r[2] for r in results),
+        'iterations': sum(r[3] for r in results),
+    }
+
+def f1_scores(y, probabilities, thresholds):
+    """F1 of the diabetic class at each threshold, in one vectorized pass"""
+    predicted = probabilities[None, :] > np.asarray(thresholds)[:, None]
+    positive = np.asarray(y) == 1
+    tp = (predicted & positive).sum(axis=1)
+    fp = (predicted & ~positive).sum(axis=1)
+    fn = (~predicted & positive).sum(axis=1)
+    return 2 * tp / np.maximum(2 * tp + fp + fn, 1)
+
+def tune_threshold(y, probabilities):
+    """Decision threshold with the best F1 on out-of-fold probabilities"""
+    thresholds = np.round(np.arange(0.05, 0.951, 0.01), 2)
+    f1 = f1_scores(y, probabilities, thresholds)
+    best = int(np.argmax(f1))
+    return float(thresholds[best]), float(f1[best])
+
+def select_model(X_train, y_train, n_splits=5, n_jobs=-1, compare=False):
+    """Pick C (best out-of-fold ROC AUC) and the decision threshold on the training split;
+    compare=True also times the naive independent grid"""
+    print("\n" + "="*50)
+    print(f"Regularization Path ({len(C_GRID)} values of C, {n_splits}-fold CV)")
+    print("="*50)
+
+    oof, warm = cross_validated_path(X_train, y_train, n_splits=n_splits, n_jobs=n_jobs, warm_start=True)
+
+    aucs = np.array([roc_auc_score(y_train, p) for p in oof])
+    losses = np.array([log_loss(y_train, p) for p in oof])
+    print(f"\n{'C':>10} {'OOF AUC':>9} {'OOF log loss':>13}")
+    for C, auc, loss in zip(C_GRID, aucs, losses):
+        print(f"{C:>10.4g} {auc:>9.4f} {loss:>13.4f}")
+
+    best = int(np.argmax(aucs))
+    best_C = float(C_GRID[best])
+    threshold, f1 = tune_threshold(y_train, oof[best])
+    print(f"\nSelected C = {best_C:.4g} (OOF ROC AUC {aucs[best]:.4f})")
+    print(f"Tuned threshold = {threshold:.2f} (OOF F1 {f1:.4f}; 0.50 gives {f1_scores(y_train, oof[best], [0.5])[0]:.4f})")
+
+    timings = [('Warm-started path', warm)]
+    if compare:
+        _, naive = cross_validated_path(X_train, y_train, n_splits=n_splits, n_jobs=n_jobs, warm_start=False)
+        timings.append(('Naive independent grid', naive))
+    print(f"\n{'':<22} {'Wall s':>8} {'Fit s':>8} {'Solver iters':>13}")
+    for name, stats in timings:
+        print(f"{name:<22} {stats['wall_seconds']:>8.2f} {stats['fit_seconds']:>8.2f} {stats['iterations']:>13,}")
+    return best_C, threshold
+
+def train_model(df, search='path', n_splits=5, n_jobs=-1, compare=False):
+    """Train the logistic regression model; returns (model, scaler, threshold)"""
     print("\n" + "="*50)
     print("Training Logistic Regression Model")
     print("="*50)
@@ -57,18 +162,24 @@ def train_model(df):
     print(f"\nTraining set size: {X_train.shape[0]}")
     print(f"Test set size: {X_test.shape[0]}")
     
+    # Model selection on the training split only; the test split stays held out
+    if search == 'path':
+        C, threshold = select_model(X_train, y_train, n_splits, n_jobs, compare)
+    else:
+        C, threshold = 1.0, 0.5
+    
     # Scale the features
     scaler = StandardScaler()
     X_train_scaled = scaler.fit_transform(X_train)
     X_test_scaled = scaler.transform(X_test)
     
     # Train the model
-    model = LogisticRegression(max_iter=1000, random_state=42)
+    model = LogisticRegression(C=C, max_iter=1000, random_state=42)
     model.fit(X_train_scaled, y_train)
     
     # Make predictions
-    y_pred = model.predict(X_test_scaled)
     y_pred_proba = model.predict_proba(X_test_scaled)[:, 1]
+    y_pred = (y_pred_proba > threshold).astype(int)
     
     # Evaluate the model
     print("\n" + "="*50)
@@ -78,7 +189,8 @@ def train_model(df):
     accuracy = accuracy_score(y_test, y_pred)
     roc_auc = roc_auc_score(y_test, y_pred_proba)
     
-    print(f"\nAccuracy: {accuracy:.4f}")
+    print(f"\nC: {C:.4g}, decision threshold: {threshold:.2f}")
+    print(f"Accuracy: {accuracy:.4f}")
     print(f"ROC AUC Score: {roc_auc:.4f}")
     
     print("\nClassification Report:")
@@ -95,22 +207,40 @@ def train_model(df):
     }).sort_values('Coefficient', ascending=False)
     print(feature_importance)
     
-    return model, scaler
+    return model, scaler, threshold
 
-def save_model_and_scaler(model, scaler):
-    """Save the trained model and scaler"""
+def save_model_and_scaler(model, scaler, medians, threshold=0.5):
+    """Save the trained model, scaler, imputation medians and decision threshold"""
     print("\n" + "="*50)
     print("Saving Model and Scaler")
     print("="*50)
     
     joblib.dump(model, 'logistic_regression_model.joblib')
     joblib.dump(scaler, 'scaler.joblib')
+    save_medians(medians)
+    save_threshold(threshold)
+
+    # Scaler folded into the coefficients, for the app's NumPy-only scorer
+    folded = fold_model(model, scaler, FEATURE_COLUMNS, medians, threshold)
+    save_folded(folded)
     
     print("\n[OK] Model saved as 'logistic_regression_model.joblib'")
     print("[OK] Scaler saved as 'scaler.joblib'")
+    print("[OK] Imputation medians saved as 'feature_medians.json'")
+    print(f"[OK] Decision threshold ({threshold:.2f}) saved as 'decision_threshold.json'")
+    print("[OK] Folded model saved as 'folded_model.json'")
 
 def main():
     """Main execution function"""
+    parser = argparse.ArgumentParser(description="Train the diabetes model.")
+    parser.add_argument('--search', choices=['path', 'single'], default='path',
+                        help="'path': cross-validated C and threshold; 'single': C=1.0, threshold 0.5.")
+    parser.add_argument('--folds', type=int, default=5)
+    parser.add_argument('--n-jobs', type=int, default=-1, help="Parallel CV folds (-1: all cores).")
+    parser.add_argument('--compare', action='store_true',
+                        help="Also time the grid without warm starts (about doubles the search).")
+    args = parser.parse_args()
+
     print("="*50)
     print("DIABETES PREDICTION MODEL TRAINING")
     print("="*50)
@@ -119,10 +249,11 @@ def main():
     df = load_and_prepare_data()
     
     # Train model
-    model, scaler = train_model(df)
+    model, scaler, threshold = train_model(df, args.search, args.folds, args.n_jobs, args.compare)
     
-    # Save model and scaler
-    save_model_and_scaler(model, scaler)
+    # Save model and scaler (filling with the median leaves the median
+    # unchanged, so the prepared data gives the imputation values)
+    save_model_and_scaler(model, scaler, feature_medians(df), threshold)
     
     print("\n" + "="*50)
     print("Training Complete!")